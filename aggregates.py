@@ -0,0 +1,139 @@
+import datetime
+import threading
+from bisect import bisect_left, insort
+
+from storage import DEFAULT_GOAL, to_number
+
+
+class SalesAggregates:
+    # Running totals, goals, team total and ranking for the board. Saves update
+    # only the reps they touch; reads come from a leaderboard that is built at
+    # most once per change and then handed out as-is.
+
+    def __init__(self, days):
+        self.days = list(days)
+        self.version = None
+        self.team_total = 0
+        self.team_goal = 0
+        self._lock = threading.Lock()
+        self._cells = {}  # name -> amount per day
+        self._totals = {}
+        self._goals = {}
+        self._teams = {}  # name -> team ('' when the rep has none)
+        self._team_rollups = {}  # team -> [total, goal, reps]
+        self._ranking = []  # (-total, name), kept sorted so rank is a bisect
+        self._leaderboard = None
+        self._leaderboard_day = None
+        self._by_name = None
+
+    def sync(self, version, rows):
+        # Catch up with a version of the table saved elsewhere (e.g. by another
+        # worker). Only reps whose cells or goal differ are touched, and nothing
+        # happens at all when we are already at that version.
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            seen = set()
+            for row in rows:
+                self._apply_row(row)
+                seen.add(row.get('Name'))
+            for name in [name for name in self._cells if name not in seen]:
+                self._remove(name)
+            self.version = version
+
+    def apply_row(self, row):
+        # A saved row from this worker; cheaper than waiting for the next sync
+        with self._lock:
+            self._apply_row(row)
+
+    def _apply_row(self, row):
+        name = row.get('Name')
+        cells = [to_number(row.get(day)) for day in self.days]
+        goal = to_number(row.get('Goal', DEFAULT_GOAL))
+        team = row.get('Team') or ''
+        if self._cells.get(name) == cells and self._goals.get(name) == goal and self._teams.get(name) == team:
+            return
+        old_total = self._totals.get(name)
+        total = sum(cells)
+        if name in self._teams:
+            self._add_to_team(self._teams[name], -(old_total or 0), -self._goals[name], -1)
+        self._add_to_team(team, total, goal, 1)
+        if old_total != total:
+            if old_total is not None:
+                del self._ranking[bisect_left(self._ranking, (-old_total, name))]
+            insort(self._ranking, (-total, name))
+        # Corrections to an earlier day work the same way: only the difference moves
+        self.team_total += total - (old_total or 0)
+        self.team_goal += goal - self._goals.get(name, 0)
+        self._cells[name] = cells
+        self._totals[name] = total
+        self._goals[name] = goal
+        self._teams[name] = team
+        self._leaderboard = None
+
+    def _add_to_team(self, team, total, goal, reps):
+        rollup = self._team_rollups.setdefault(team, [0, 0, 0])
+        rollup[0] += total
+        rollup[1] += goal
+        rollup[2] += reps
+        if rollup[2] == 0:
+            del self._team_rollups[team]
+
+    def _remove(self, name):
+        total = self._totals.pop(name)
+        del self._ranking[bisect_left(self._ranking, (-total, name))]
+        self.team_total -= total
+        goal = self._goals.pop(name)
+        self.team_goal -= goal
+        self._add_to_team(self._teams.pop(name), -total, -goal, -1)
+        del self._cells[name]
+        self._leaderboard = None
+
+    def days_elapsed(self, today=None):
+        # Board days done so far this week, counting today; the whole week at weekends
+        weekday = (today or datetime.date.today()).weekday()
+        return max(1, min(weekday + 1, len(self.days)))
+
+    def _progress(self, total, goal, today):
+        elapsed = self.days_elapsed(today)
+        remaining = len(self.days) - elapsed
+        pace = total / elapsed
+        return {
+            'total': total,
+            'goal': goal,
+            'percent': (100.0 * total / goal) if goal else 0.0,
+            'pace': pace,  # Average per day so far
+            'projected': pace * len(self.days),
+            'needed_per_day': max(goal - total, 0) / remaining if remaining else max(goal - total, 0),
+        }
+
+    def leaderboard(self, today=None):
+        # Reps best first, with rank, percent of goal and pace. Pace depends on
+        # the day, so the cached list is also rebuilt when the date moves on.
+        today = today or datetime.date.today()
+        with self._lock:
+            if self._leaderboard is None or self._leaderboard_day != today:
+                self._leaderboard = [
+                    dict(self._progress(-negative_total, self._goals[name], today), rank=rank, name=name)
+                    for rank, (negative_total, name) in enumerate(self._ranking, start=1)
+                ]
+                self._leaderboard_day = today
+                self._by_name = {entry['name']: entry for entry in self._leaderboard}
+            return self._leaderboard
+
+    def rep(self, name, today=None):
+        self.leaderboard(today)
+        return self._by_name.get(name)
+
+    def team(self, today=None):
+        return self._progress(self.team_total, self.team_goal, today)
+
+    def top(self, count, today=None):
+        return self.leaderboard(today)[:count]
+
+    def team_rollups(self, today=None):
+        # Progress per team, best first; reps without a team are left out
+        with self._lock:
+            rollups = [(team, total, goal, reps) for team, (total, goal, reps) in self._team_rollups.items() if team]
+        rollups.sort(key=lambda rollup: (-rollup[1], rollup[0]))
+        return [dict(self._progress(total, goal, today), team=team, reps=reps) for team, total, goal, reps in rollups]
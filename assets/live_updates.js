@@ -0,0 +1,41 @@
+if (!window.dash_clientside) { window.dash_clientside = {}; }
+window.dash_clientside.live = {
+    startLiveUpdates: function(pathname) {
+        // Open one stream per browser tab; later calls are no-ops
+        if (window.salesEventSource || !window.EventSource) {
+            return window.dash_clientside.no_update;
+        }
+        var seen = {};
+        var source = new EventSource('/sales-events');
+        window.salesEventSource = source;
+
+        source.addEventListener('change', function(event) {
+            var versions = JSON.parse(event.data);
+            // Only touch a store when its file actually changed, so the server
+            // callbacks behind it run once per save instead of once per message
+            if (versions.sales !== seen.sales) {
+                window.dash_clientside.set_props('sales-version-push', {data: versions.sales});
+            }
+            if (versions.incentive !== seen.incentive) {
+                window.dash_clientside.set_props('incentive-version-push', {data: versions.incentive});
+            }
+            if (!seen.connected) {
+                window.dash_clientside.set_props('push-connected', {data: true});
+            }
+            seen = versions;
+            seen.connected = true;
+        });
+        source.onerror = function() {
+            // EventSource reconnects by itself; poll in the meantime
+            if (seen.connected) {
+                seen.connected = false;
+                window.dash_clientside.set_props('push-connected', {data: false});
+            }
+        };
+        return window.dash_clientside.no_update;
+    },
+    togglePolling: function(connected) {
+        // The interval stays in the page as a fallback and only runs while the stream is down
+        return connected === true;
+    }
+}
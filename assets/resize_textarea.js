@@ -9,5 +9,26 @@ window.dash_clientside.clientside = {
             }
         }, 0);
         return window.dash_clientside.no_update;
+    },
+
+    // Only full access can edit the table and the incentive text
+    setEditable: function(accessData) {
+        var full = !!accessData && accessData.access === 'full';
+        return [full, !full];  // sales-table.editable, incentive-text.disabled
+    },
+
+    // Play the sale sound while a notification shows, except on the login page
+    playNotificationAudio: function(notificationData, pathname, assetUrls) {
+        var data = notificationData ? JSON.parse(notificationData) : {};
+        if (data.show_notification && pathname !== '/' && pathname !== '/index_page') {
+            return assetUrls.notification_audio;
+        }
+        return '';
+    },
+
+    // Swap the deal images on every image-interval tick
+    cycleImage: function(nIntervals, assetUrls) {
+        var images = assetUrls.images;
+        return images[(nIntervals || 0) % images.length];
     }
 }
@@ -0,0 +1,116 @@
+"""Micro-benchmarks for the data path at larger roster sizes.
+
+Times load_data_from_json, save_data_to_json, update_graph and a sorted,
+filtered table page. A cold load parses straight from storage; a warm load
+is the shared-snapshot hit every callback sees. Everything runs against a throwaway workspace in a
+temp directory, so the real sales_data.json is never touched.
+
+Run from the repository root:
+    python benchmarks/bench_data.py [--reps 100 1000 5000] [--storage sqlite]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from table_query import TableIndex
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+ROSTER_SIZES = (100, 1000, 5000)
+
+
+def make_rows(count, seed=0):
+    # Mix of ints and strings, like the table sends after an edit
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {'Name': f"Rep {i}"}
+        for day in WEEKDAYS:
+            value = rng.randint(0, 2000)
+            row[day] = str(value) if rng.random() < 0.3 else value
+        row['Goal'] = 50000
+        rows.append(row)
+    return rows
+
+
+def use_workspace(storage='json'):
+    # Point the app at an empty temp directory. Must run before `import app`,
+    # since storage paths are relative and the backend is picked on first use.
+    workspace = tempfile.mkdtemp(prefix='ecs-bench-')
+    os.chdir(workspace)
+    os.environ['ECS_STORAGE'] = storage
+    os.environ['ECS_SQLITE_PATH'] = os.path.join(workspace, 'sales_data.db')
+    os.environ['ECS_SALES_SNAPSHOT'] = os.path.join(workspace, '.sales_snapshot')
+    os.environ['ECS_INCENTIVE_SNAPSHOT'] = os.path.join(workspace, '.incentive_snapshot')
+    with open('sales_data.json', 'w') as file:
+        json.dump([], file)
+    with open('incentive_data.json', 'w') as file:
+        json.dump({'incentive_text': 'Benchmark incentive'}, file)
+    return workspace
+
+
+def load_app():
+    # Quiet the per-save prints while timing
+    import app
+    app.print = lambda *args, **kwargs: None
+    return app
+
+
+def seed(app, rows):
+    app.save_data_to_json(rows)
+    app.load_data_from_json()
+
+
+def best_of(func, number, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Data path micro-benchmarks')
+    parser.add_argument('--reps', type=int, nargs='+', default=list(ROSTER_SIZES))
+    parser.add_argument('--storage', choices=['json', 'sqlite'], default='json')
+    args = parser.parse_args(argv)
+
+    workspace = use_workspace(args.storage)
+    try:
+        app = load_app()
+        print(f"storage: {args.storage}")
+        print(f"{'reps':>6} {'cold load ms':>13} {'warm load ms':>13} {'save ms':>10} {'graph ms':>10} {'graph patch ms':>15} {'page ms':>13}")
+        for count in args.reps:
+            rows = make_rows(count)
+            seed(app, rows)
+            number = 20 if count <= 1000 else 5
+            cold = best_of(app._read_sales, number)
+            warm = best_of(app.load_data_from_json, number * 50)
+
+            edited = [dict(row) for row in rows]
+            flip = [0]
+
+            def save():
+                # One changed cell per save, like an editor typing in a sale
+                flip[0] += 1
+                edited[flip[0] % count]['Monday'] = flip[0]
+                app.save_data_to_json(edited)
+
+            saved = best_of(save, max(1, number // 4))
+            full = best_of(lambda: app.update_graph(None, None, None), number)
+            _, names = app.update_graph(None, None, None)
+            patched = best_of(lambda: app.update_graph(None, None, names), number)
+            # A new sort on a fresh version: builds the column and its order, then pages
+            records = app.load_data_from_json()
+            sorted_page = best_of(lambda: TableIndex(records, app.NUMERIC_COLUMNS).query('{Total} > 100', [{'column_id': 'Total', 'direction': 'desc'}], 3, 10), number)
+            print(f"{count:>6} {cold * 1000:>13.3f} {warm * 1000:>13.4f} {saved * 1000:>10.3f} {full * 1000:>10.3f} {patched * 1000:>15.3f} {sorted_page * 1000:>13.3f}")
+    finally:
+        os.chdir(REPO)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
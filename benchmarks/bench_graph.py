@@ -0,0 +1,95 @@
+"""Compare the old pandas/go.Figure update_graph with the figures.py path.
+
+Run from the repository root:  python benchmarks/bench_graph.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+from figures import sales_bars, sales_figure, sales_figure_patch
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+ROSTER_SIZES = (7, 100, 1000)
+
+
+def legacy_update_graph(rows):
+    # update_graph as it was before figures.py, kept here as the baseline
+    df = pd.DataFrame(rows)
+    for col in WEEKDAYS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df['Total'] = df[WEEKDAYS].sum(axis=1)
+    total_sales = df['Total'].sum()
+    df = pd.concat([df, pd.DataFrame([{'Name': 'Total Sales', 'Total': total_sales}])], ignore_index=True)
+    colors = df['Total'].apply(lambda x:
+                               'black' if x <= 999 else
+                               'red' if 999 < x <= 1999 else
+                               'blue' if 1999 < x <= 2999 else
+                               'green' if 2999 < x <= 3999 else
+                               'purple' if 3999 < x <= 4999 else
+                               'orange')
+    fig = go.Figure(data=[
+        go.Bar(y=df['Name'], x=df['Total'], orientation='h', marker_color=colors,
+               text=df['Total'], textposition='auto')
+    ])
+    fig.update_layout(
+        title_text='Sales', title_x=0.5,
+        title_font=dict(size=24, family='Impact, Charcoal, sans-serif'),
+        yaxis={'categoryorder': 'total ascending'},
+        paper_bgcolor='rgba(0, 0, 0, 0)', font_color='#FFFFFF',
+        plot_bgcolor='rgba(0, 0, 0, 0)', height=700
+    )
+    return fig
+
+
+def new_update_graph(rows):
+    # Steady state of the new callback: same bars, so only a Patch goes out
+    names, totals, colors = sales_bars(rows, WEEKDAYS)
+    return sales_figure_patch(totals, colors)
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {'Name': f"Rep {i}", 'Goal': 50000}
+        for day in WEEKDAYS:
+            # Mix of ints and strings, like the table sends after an edit
+            value = rng.randint(0, 2000)
+            row[day] = str(value) if rng.random() < 0.3 else value
+        rows.append(row)
+    return rows
+
+
+def payload_bytes(value):
+    if hasattr(value, 'to_plotly_json'):
+        value = value.to_plotly_json()
+    return len(json.dumps(value, cls=PlotlyJSONEncoder))
+
+
+def best_of(func, rows, number):
+    return min(timeit.repeat(lambda: func(rows), number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'reps':>6} {'old ms':>10} {'new ms':>10} {'speedup':>8} {'old bytes':>10} {'new bytes':>10} {'first paint':>12}")
+    for count in ROSTER_SIZES:
+        rows = make_rows(count)
+        number = 50 if count < 1000 else 10
+        old = best_of(legacy_update_graph, rows, number)
+        new = best_of(new_update_graph, rows, number)
+        first_paint = payload_bytes(sales_figure(*sales_bars(rows, WEEKDAYS)))
+        print(f"{count:>6} {old * 1000:>10.3f} {new * 1000:>10.3f} {old / new:>7.1f}x "
+              f"{payload_bytes(legacy_update_graph(rows)):>10} {payload_bytes(new_update_graph(rows)):>10} {first_paint:>12}")
+
+
+if __name__ == '__main__':
+    main()
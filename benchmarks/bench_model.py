@@ -0,0 +1,89 @@
+"""Typed sales model against the pandas path it replaced.
+
+Both sides turn the stored rows into the records the table shows:
+- pandas: the old read. It builds a DataFrame from rows that mix "0" and 0,
+  runs pd.to_numeric(...).fillna(0) over every weekday and turns the result
+  back into dicts. Before the snapshots, load_data_from_json and update_graph
+  each did this, so every data change paid for it twice.
+- model: SalesBoard(rows).records() on rows storage normalized when it wrote
+  them. This runs once per data change, in the worker that saved.
+- model, old file: the same on rows that were never normalized. numpy reads
+  numeric strings such as "0" as they are; only text that isn't a number
+  takes the per-cell fallback.
+
+For each roster size this prints:
+- CPU per records build, and per data change;
+- peak memory allocated while building (tracemalloc);
+- memory held by the records.
+
+Run from the repository root (pandas is only needed for the comparison):
+    python benchmarks/bench_model.py [--reps 100 1000 5000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_data import WEEKDAYS, best_of, make_rows
+from sales_model import SalesBoard
+from storage import normalize_rows
+from tiers import add_tiers
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def pandas_records(rows):
+    # The read path as it was: DataFrame, to_numeric per weekday, back to dicts
+    df = pd.DataFrame(rows)
+    for day in WEEKDAYS:
+        df[day] = pd.to_numeric(df[day], errors='coerce').fillna(0)
+    df['Total'] = df[WEEKDAYS].sum(axis=1)
+    records = df.to_dict('records')
+    add_tiers(records, WEEKDAYS + ['Total'])
+    return records
+
+
+def model_records(rows):
+    return SalesBoard(rows, WEEKDAYS).records()
+
+
+def memory(func):
+    # (peak MB allocated while running, MB still held by the result)
+    tracemalloc.start()
+    result = func()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 2 ** 20, held / 2 ** 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Typed sales model vs pandas')
+    parser.add_argument('--reps', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args(argv)
+    if pd is None:
+        print("pandas is not installed; only the model is timed")
+
+    print(f"{'reps':>6} {'path':<16} {'records ms':>11} {'per change ms':>14} {'peak MB':>9} {'held MB':>9}")
+    for count in args.reps:
+        legacy = make_rows(count)  # 30% of cells are strings, like the old files
+        stored = normalize_rows(legacy)
+        number = 20 if count <= 1000 else 5
+        paths = [('model', lambda: model_records(stored), 1),
+                 ('model, old file', lambda: model_records(legacy), 1)]
+        if pd is not None:
+            # Parsed twice per change: once for the table, once for the graph
+            paths.insert(0, ('pandas', lambda: pandas_records(legacy), 2))
+        for label, build, per_change in paths:
+            seconds = best_of(build, number)
+            peak, held = memory(build)
+            print(f"{count:>6} {label:<16} {seconds * 1000:>11.3f} {per_change * seconds * 1000:>14.3f} {peak:>9.2f} {held:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
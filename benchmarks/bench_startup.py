@@ -0,0 +1,117 @@
+"""Worker start-up: import time and time to first response.
+
+Every run is a fresh interpreter that imports the app through
+wsgi.create_app() and then serves what a screen asks for first: the Dash
+index page, the layout and the board (display_page for /page_1, which also
+makes the first data load). Where os.fork exists, it also times the same first
+requests in a worker forked from the imported process, the way
+gunicorn --preload starts workers.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 5] [--reps 100]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_data import REPO, make_rows, use_workspace
+
+HEAVY_MODULES = ('pandas', 'plotly.express', 'IPython')
+
+
+def first_responses(server):
+    # Milliseconds until the board is on screen for the first viewer
+    client = server.test_client()
+    started = time.perf_counter()
+    client.get('/')
+    client.get('/_dash-layout')
+    response = client.post('/_dash-update-component', json={
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [{'id': 'url', 'property': 'pathname', 'value': '/page_1'},
+                   {'id': 'user-access-level', 'property': 'data', 'value': {'access': 'full'}}],
+        'changedPropIds': ['url.pathname'],
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"first callback failed: {response.status_code}")
+    return (time.perf_counter() - started) * 1000
+
+
+def forked_first_response(server):
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        with os.fdopen(write_end, 'w') as pipe:
+            pipe.write(json.dumps(first_responses(server)))
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        elapsed = json.loads(pipe.read())
+    os.waitpid(pid, 0)
+    return elapsed
+
+
+def child(reps):
+    workspace = use_workspace()
+    try:
+        with open('sales_data.json', 'w') as file:
+            json.dump(make_rows(reps), file)
+        sys.path.insert(0, REPO)
+        started = time.perf_counter()
+        import wsgi
+        server = wsgi.create_app()
+        result = {'import': (time.perf_counter() - started) * 1000,
+                  'heavy': [name for name in HEAVY_MODULES if name in sys.modules]}
+        if hasattr(os, 'fork'):
+            result['forked'] = forked_first_response(server)
+        result['first'] = first_responses(server)
+        print(json.dumps(result))
+    finally:
+        os.chdir(REPO)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Worker start-up benchmark')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--reps', type=int, default=100)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.reps)
+        return
+
+    results = []
+    interpreter = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        interpreter.append((time.perf_counter() - started) * 1000)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--reps', str(args.reps)],
+                                check=True, capture_output=True, text=True, cwd=REPO).stdout
+        # The app prints while it loads; the result is the last line
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    def median(key):
+        return statistics.median(result[key] for result in results)
+
+    print(f"{args.runs} runs, {args.reps} reps, median ms")
+    print(f"{'python start':<32} {statistics.median(interpreter):>9.1f}")
+    print(f"{'import + warm-up (create_app)':<32} {median('import'):>9.1f}")
+    print(f"{'first response, fresh worker':<32} {median('first'):>9.1f}")
+    print(f"{'ready, fresh worker':<32} {median('import') + median('first'):>9.1f}")
+    if all('forked' in result for result in results):
+        print(f"{'first response, --preload fork':<32} {median('forked'):>9.1f}")
+    print(f"heavy modules imported: {', '.join(results[-1]['heavy']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""In-process load test: N dashboards polling, M editors saving.
+
+Runs the real app.server through Flask's test client. Every dashboard
+thread sends the interval tick callbacks a screen sends: manage_notification,
+refresh_incentive_text and refresh_sales_data, plus update_graph whenever
+the data version changed. Every editor thread types one sale at a time through
+save_table_on_edit. Each callback gets its p50/p99 latency, average response
+bytes and requests per second. It also reports how long a save took to show
+up on every dashboard. Kiosk threads poll /kiosk/data the way a wall screen
+does, sending back the ETag they were last given.
+
+Run from the repository root:
+    python benchmarks/load_test.py [--dashboards 20] [--editors 2] [--kiosks 0] [--reps 100] [--seconds 10]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_data import REPO, load_app, make_rows, seed, use_workspace
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.bytes = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.propagation = []
+
+    def add(self, name, seconds, size, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.bytes[name] += size
+            if not ok:
+                self.errors[name] += 1
+
+
+class Session:
+    # One browser tab: builds the _dash-update-component bodies the renderer sends
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.client = app.server.test_client()
+        self.recorder = recorder
+
+    def call(self, name, output, inputs, state=None, changed=None):
+        spec = self.app.app.callback_map[output]
+        outputs = [
+            {'id': part.split('@')[0].rsplit('.', 1)[0], 'property': part.split('@')[0].rsplit('.', 1)[1]}
+            for part in output.strip('.').split('...')
+        ]
+        body = {
+            'output': output,
+            'outputs': outputs if output.startswith('..') else outputs[0],
+            'inputs': [dict(item, value=inputs.get(f"{item['id']}.{item['property']}")) for item in spec['inputs']],
+            'state': [dict(item, value=(state or {}).get(f"{item['id']}.{item['property']}")) for item in spec['state']],
+            'changedPropIds': changed or [],
+        }
+        started = time.perf_counter()
+        response = self.client.post('/_dash-update-component', json=body)
+        elapsed = time.perf_counter() - started
+        data = response.get_data()
+        self.recorder.add(name, elapsed, len(data), response.status_code in (200, 204))
+        if response.status_code != 200:
+            return {}
+        return json.loads(data).get('response', {})
+
+
+def output_key(app, *outputs):
+    # The callback_map key Dash registered for these outputs
+    for key in app.app.callback_map:
+        parts = [part.split('@')[0] for part in key.strip('.').split('...')]
+        if parts == list(outputs):
+            return key
+    raise KeyError(outputs)
+
+
+def dashboard(app, recorder, keys, saves, stop, tick):
+    session = Session(app, recorder)
+    notification = json.dumps({'last_seq': None, 'show_notification': False})
+    table_version = app.sales_data_version()
+    graph_names = None
+    n = 0
+    while not stop.is_set():
+        n += 1
+        response = session.call('manage_notification', keys['notification'],
+                                {'interval-component.n_intervals': n}, {'notification-data.data': notification},
+                                ['interval-component.n_intervals'])
+        notification = response.get('notification-data', {}).get('data', notification)
+        session.call('refresh_incentive_text', keys['incentive'], {'interval-component.n_intervals': n},
+                     changed=['interval-component.n_intervals'])
+        response = session.call('refresh_sales_data', keys['sales'], {'interval-component.n_intervals': n},
+                                {'sales-table-version.data': table_version}, ['interval-component.n_intervals'])
+        if 'sales-table-version' in response:
+            table_version = response['sales-table-version']['data']
+            seen = time.perf_counter()
+            saved_at = saves.get(table_version)
+            if saved_at is not None:
+                with recorder._lock:
+                    recorder.propagation.append(seen - saved_at)
+            response = session.call('update_graph', keys['graph'], {'sales-table-version.data': table_version},
+                                    {'sales-graph-names.data': graph_names}, ['sales-table-version.data'])
+            graph_names = response.get('sales-graph-names', {}).get('data', graph_names)
+        stop.wait(tick)
+
+
+def kiosk(app, recorder, stop, tick):
+    client = app.server.test_client()
+    tag = None
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = client.get('/kiosk/data', headers={'If-None-Match': tag} if tag else {})
+        elapsed = time.perf_counter() - started
+        name = 'kiosk 304' if response.status_code == 304 else 'kiosk 200'
+        recorder.add(name, elapsed, len(response.get_data()), response.status_code in (200, 304))
+        tag = response.headers.get('ETag', tag)
+        stop.wait(tick)
+
+
+def editor(app, recorder, keys, saves, stop, pause, seed_value):
+    session = Session(app, recorder)
+    rng = random.Random(seed_value)
+    while not stop.is_set():
+        # Editors work on the first page of the table, like the board shows it
+        previous, _ = app.table_page(app.sales_data_version(), app.load_data_from_json(), 0, None, [], '')
+        data = [dict(row) for row in previous]
+        row = rng.choice(data)
+        row[rng.choice(app.weekdays)] = rng.randint(0, 6000)
+        session.call('save_table_on_edit', keys['save'], {'sales-table.data_timestamp': int(time.time() * 1000)},
+                     {'sales-table.data': data, 'sales-table.data_previous': previous,
+                      'user-access-level.data': {'access': 'full'}}, ['sales-table.data_timestamp'])
+        saves[app.sales_data_version()] = time.perf_counter()
+        stop.wait(pause)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='In-process dashboard load test')
+    parser.add_argument('--dashboards', type=int, default=20)
+    parser.add_argument('--editors', type=int, default=2)
+    parser.add_argument('--kiosks', type=int, default=0, help='Wall screens polling the kiosk view')
+    parser.add_argument('--reps', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--tick', type=float, default=0.5, help='Seconds between a dashboard\'s polls')
+    parser.add_argument('--edit-pause', type=float, default=0.5, help='Seconds between an editor\'s saves')
+    parser.add_argument('--storage', choices=['json', 'sqlite'], default='json')
+    args = parser.parse_args(argv)
+
+    workspace = use_workspace(args.storage)
+    try:
+        app = load_app()
+        seed(app, make_rows(args.reps))
+        keys = {
+            'notification': output_key(app, 'notification.style', 'notification.children', 'notification-data.data', 'notification-timer.disabled'),
+            'incentive': output_key(app, 'incentive-text.value'),
+            'sales': output_key(app, 'sales-table.data', 'sales-table.page_count', 'sales-table-version.data'),
+            'graph': output_key(app, 'sales-graph.figure', 'sales-graph-names.data'),
+            'save': output_key(app, 'save-status.children', 'sales-table.data'),
+        }
+        recorder = Recorder()
+        saves = {}
+        stop = threading.Event()
+        threads = [threading.Thread(target=dashboard, args=(app, recorder, keys, saves, stop, args.tick)) for _ in range(args.dashboards)]
+        threads += [threading.Thread(target=kiosk, args=(app, recorder, stop, args.tick)) for _ in range(args.kiosks)]
+        threads += [threading.Thread(target=editor, args=(app, recorder, keys, saves, stop, args.edit_pause, i)) for i in range(args.editors)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+
+        print(f"{args.dashboards} dashboards, {args.kiosks} kiosks, {args.editors} editors, {args.reps} reps, {args.storage}, {duration:.1f}s")
+        print(f"{'callback':<24} {'requests':>9} {'rps':>8} {'p50 ms':>9} {'p99 ms':>9} {'avg bytes':>10} {'errors':>7}")
+        for name, latencies in sorted(recorder.latencies.items()):
+            print(f"{name:<24} {len(latencies):>9} {len(latencies) / duration:>8.1f} "
+                  f"{percentile(latencies, 0.5) * 1000:>9.2f} {percentile(latencies, 0.99) * 1000:>9.2f} "
+                  f"{recorder.bytes[name] / len(latencies):>10.0f} {recorder.errors[name]:>7}")
+        total = sum(len(latencies) for latencies in recorder.latencies.values())
+        print(f"{'all':<24} {total:>9} {total / duration:>8.1f}")
+        if recorder.propagation:
+            print(f"save -> screen: p50 {percentile(recorder.propagation, 0.5) * 1000:.1f} ms, "
+                  f"p99 {percentile(recorder.propagation, 0.99) * 1000:.1f} ms over {len(recorder.propagation)} updates "
+                  f"(polling every {args.tick}s)")
+    finally:
+        os.chdir(REPO)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import csv
+import datetime
+import hmac
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from flask import Response, jsonify, request, stream_with_context
+
+from history import ISO_DAYS, history, iso_week
+from storage import get_backend, record_days, to_number
+
+try:
+    import openpyxl  # In requirements.txt; without it only CSV imports work
+except ImportError:
+    openpyxl = None
+
+
+IMPORT_URL = '/sales-import'
+EXPORT_URL = '/sales-export'
+# The endpoints are off unless a token is set; callers send "Authorization: Bearer <token>"
+IMPORT_TOKEN = os.environ.get('ECS_IMPORT_TOKEN')
+DEFAULT_DAYS = ISO_DAYS[:5]
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+SPOOL_BYTES = 8 * 1024 * 1024  # XLSX uploads above this go to a temp file
+MAX_ERRORS = 50  # Problems listed in the report; the rest are only counted
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d.%m.%Y')
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.errors = []
+        self.changed = 0
+        self.added = 0
+        self.seconds = 0.0
+
+    def error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+    def as_dict(self):
+        return {
+            'rows': self.rows, 'skipped': self.skipped, 'errors': self.errors,
+            'reps_changed': self.changed, 'reps_added': self.added, 'seconds': round(self.seconds, 3),
+        }
+
+
+def board_days(rows):
+    # Day columns in week order, or Monday-Friday for an empty board
+    days = set(record_days(rows[0])) if rows else set()
+    return [day for day in ISO_DAYS if day in days] or list(DEFAULT_DAYS)
+
+
+def parse_amount(value):
+    # CRM numbers come as 1234, "1,234.50" or "$1,234"; blank means 0
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    text = str(value if value is not None else '').strip().replace(',', '').replace('$', '')
+    if not text:
+        return 0
+    number = float(text)  # ValueError for anything else
+    return int(number) if number.is_integer() else number
+
+
+def parse_day(value, days, week=None):
+    # A day name ("Monday", "mon") or a date, as the board's day column. The
+    # board only holds one ISO week (default: this one), so a date from any
+    # other week is an error rather than a sale on that weekday.
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    date = value if isinstance(value, datetime.date) else None
+    day = None
+    if date is None:
+        text = str(value or '').strip()
+        day = next((name for name in ISO_DAYS if text.lower() in (name.lower(), name[:3].lower())), None)
+        for date_format in DATE_FORMATS if day is None else ():
+            try:
+                date = datetime.datetime.strptime(text[:10], date_format).date()
+                break
+            except ValueError:
+                continue
+    if date is not None:
+        week = week or iso_week()
+        if iso_week(date) != week:
+            raise ValueError(f"{date.isoformat()} is in {iso_week(date)}, not the board's week {week}")
+        day = ISO_DAYS[date.weekday()]
+    if day not in days:
+        raise ValueError(f"{value!r} is not a day on the board")
+    return day
+
+
+def collect_updates(rows, days, report, week=None):
+    # One pass over the rows: validate, coerce and fold them into
+    # {name: {field: value}}. Memory grows with reps, not with the file.
+    #   Long exports (Name, Day or Date, Amount): amounts are summed per rep and day;
+    #   dated rows outside the board's week are reported and skipped
+    #   Wide exports (Name, Monday, ..., Goal, Team): the cells are set as given
+    # Either way the cells end up set to what the file says, so re-running an
+    # import is harmless.
+    updates = {}
+    day_columns = {day.lower(): day for day in days}
+    for line, row in rows:
+        report.rows += 1
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+        name = str(row.get('name') or row.get('rep') or '').strip()
+        if not name:
+            report.error(line, 'no rep name')
+            continue
+        try:
+            fields = {}
+            if 'amount' in row:
+                day = parse_day(row.get('day') if row.get('day') not in (None, '') else row.get('date'), days, week)
+                fields[day] = updates.get(name, {}).get(day, 0) + parse_amount(row['amount'])
+            else:
+                fields.update({day_columns[key]: parse_amount(value) for key, value in row.items() if key in day_columns})
+            if row.get('goal') not in (None, ''):
+                fields['Goal'] = parse_amount(row['goal'])
+            if row.get('team') not in (None, ''):
+                fields['Team'] = str(row['team']).strip()
+        except ValueError as e:
+            report.error(line, str(e))
+            continue
+        updates.setdefault(name, {}).update(fields)
+    return updates
+
+
+def csv_rows(stream):
+    # Binary stream -> (line, row) pairs, read incrementally
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def xlsx_rows(file):
+    if openpyxl is None:
+        raise RuntimeError("openpyxl is required for .xlsx imports (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else None for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def import_rows(rows, backend=None, days=None):
+    # Validate everything, then make a single batched write with no sale
+    # events, so the screens get one change instead of one per cell.
+    backend = backend or get_backend()
+    started = time.perf_counter()
+    report = ImportReport()
+    days = days or board_days(backend.load_sales())
+    updates = collect_updates(rows, days, report)
+    if updates:
+        report.changed, report.added = backend.bulk_update(updates, days)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def export_current(rows, days):
+    # CSV lines for the board as it is now
+    yield _csv_line(['Name', 'Team'] + list(days) + ['Total', 'Goal'])
+    for row in rows:
+        amounts = [to_number(row.get(day)) for day in days]
+        yield _csv_line([row.get('Name'), row.get('Team', '')] + amounts + [sum(amounts), row.get('Goal', '')])
+
+
+def export_history():
+    # CSV lines for every archived week
+    yield _csv_line(['Week', 'Date', 'Name', 'Day', 'Amount'])
+    for values in history.rows():
+        yield _csv_line(values)
+
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _authorized(token):
+    return bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+
+
+def register_bulk_io(server, days, load_rows, on_saved, token=IMPORT_TOKEN):
+    # load_rows() gives the current board; on_saved() runs once after an import
+    # (the app refreshes its caches and pushes one change to the screens)
+
+    @server.route(IMPORT_URL, methods=['POST'])
+    def sales_import():
+        if not _authorized(token):
+            return jsonify({'error': 'import is disabled or the token is wrong'}), 403
+        if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+            return jsonify({'error': 'file too large'}), 413
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        filename = (upload.filename if upload else request.args.get('filename')) or ''
+        file_format = request.args.get('format') or ('xlsx' if filename.lower().endswith('.xlsx') else 'csv')
+        try:
+            if file_format == 'xlsx':
+                # Zip files need random access, so spool the upload first
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spooled:
+                    shutil.copyfileobj(stream, spooled, 64 * 1024)
+                    spooled.seek(0)
+                    report = import_rows(xlsx_rows(spooled), days=days)
+            else:
+                report = import_rows(csv_rows(stream), days=days)
+        except (RuntimeError, csv.Error, UnicodeDecodeError, zipfile.BadZipFile) as e:
+            return jsonify({'error': str(e)}), 400
+        if report.changed or report.added:
+            on_saved()
+        return jsonify(report.as_dict())
+
+    @server.route(EXPORT_URL)
+    def sales_export():
+        if not _authorized(token):
+            return jsonify({'error': 'export is disabled or the token is wrong'}), 403
+        scope = request.args.get('scope', 'current')
+        lines = export_history() if scope == 'history' else export_current(load_rows(), days)
+        return Response(stream_with_context(lines), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename="sales-{scope}.csv"'})
+
+    return sales_import
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk sales import and export')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help='Load a CRM export (CSV or XLSX) into the board')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=['csv', 'xlsx'], default=None)
+    export_parser = subparsers.add_parser('export', help='Write the board or the archive as CSV')
+    export_parser.add_argument('--history', action='store_true', help='Every archived week instead of the current board')
+    export_parser.add_argument('--output', default='-')
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        file_format = args.format or ('xlsx' if args.file.lower().endswith('.xlsx') else 'csv')
+        with open(args.file, 'rb') as file:
+            report = import_rows(xlsx_rows(file) if file_format == 'xlsx' else csv_rows(file))
+        if report.changed or report.added:
+            # Running dashboards pick the change up from the storage version on their own
+            rows = get_backend().load_sales()
+            history.record_board(rows, board_days(rows))
+        print(json.dumps(report.as_dict(), indent=4))
+
+    if args.command == 'export':
+        if args.history:
+            lines = export_history()
+        else:
+            rows = get_backend().load_sales()
+            lines = export_current(rows, board_days(rows))
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+        try:
+            output.writelines(lines)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+
+if __name__ == '__main__':
+    main()
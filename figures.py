@@ -0,0 +1,123 @@
+import numpy as np
+import plotly.graph_objects as go
+from dash import Patch
+
+from sales_model import day_matrix, plain_numbers
+from tiers import tier_colors
+
+
+TOTAL_LABEL = 'Total Sales'
+TEAM_LABEL = 'Team {}'
+
+_base_figure = None
+
+
+def _figure_template():
+    # Layout is the same on every update, so build (and validate) it once
+    global _base_figure
+    if _base_figure is None:
+        fig = go.Figure(data=[go.Bar(orientation='h', textposition='auto')])
+        # Update graph layout to center the title and match the app's background color
+        fig.update_layout(
+            title_text='Sales',
+            title_x=0.5,  # Center the title
+            title_font=dict(size=24, family='Impact, Charcoal, sans-serif'),
+            yaxis={'categoryorder': 'total ascending'},
+            paper_bgcolor='rgba(0, 0, 0, 0)',  # Match the app's background color
+            font_color='#FFFFFF',
+            plot_bgcolor='rgba(0, 0, 0, 0)',  # Improve text contrast against the dark background
+            height=700
+        )
+        _base_figure = fig.to_plotly_json()
+    return _base_figure
+
+
+def warm_up():
+    # plotly loads its validators and default template on the first Figure.
+    # Doing that here (in the gunicorn master with --preload) spares every
+    # worker's first viewer; nothing in it depends on the data.
+    _figure_template()
+    goal_figure([])
+    history_figure([], [], '')
+
+
+def sales_bars(rows, days):
+    # Names, totals and colors for one bar per rep plus the team total bar
+    totals = day_matrix(rows, days).sum(axis=1)
+    totals = np.append(totals, totals.sum())
+    names = [row.get('Name') for row in rows] + [TOTAL_LABEL]
+    colors = tier_colors(totals)  # Same bands as the table
+    return names, plain_numbers(totals), colors.tolist()
+
+
+def leaderboard_bars(top, team_rollups, team_total):
+    # Top reps, one bar per team and the overall total. The bar count depends
+    # on the leaderboard size and number of teams, not on headcount. Bars go
+    # in name order (the axis sorts them by total), so a change in rank alone
+    # is still just a Patch.
+    top = sorted(top, key=lambda entry: entry['name'])
+    names = [entry['name'] for entry in top]
+    totals = [entry['total'] for entry in top]
+    if len(team_rollups) > 1:
+        team_rollups = sorted(team_rollups, key=lambda rollup: rollup['team'])
+        names += [TEAM_LABEL.format(rollup['team']) for rollup in team_rollups]
+        totals += [rollup['total'] for rollup in team_rollups]
+    names.append(TOTAL_LABEL)
+    totals = np.append(np.array(totals, dtype=float), team_total)
+    return names, plain_numbers(totals), tier_colors(totals).tolist()
+
+
+def sales_figure(names, totals, colors):
+    figure = dict(_figure_template())
+    bar = dict(figure['data'][0], y=names, x=totals, text=totals, marker={'color': colors})
+    figure['data'] = [bar]
+    return figure
+
+
+def sales_figure_patch(totals, colors):
+    # Same bars, new numbers: send only the arrays that move
+    patch = Patch()
+    patch['data'][0]['x'] = totals
+    patch['data'][0]['text'] = totals
+    patch['data'][0]['marker']['color'] = colors
+    return patch
+
+
+def history_figure(labels, values, title, orientation='v'):
+    # Plain bar chart in the dashboard's style for the history page
+    bar = go.Bar(x=labels, y=values, marker_color='orange') if orientation == 'v' else \
+        go.Bar(y=labels, x=values, orientation='h', marker_color='orange', text=values, textposition='auto')
+    fig = go.Figure(data=[bar])
+    fig.update_layout(
+        title_text=title,
+        title_x=0.5,
+        title_font=dict(size=24, family='Impact, Charcoal, sans-serif'),
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font_color='#FFFFFF',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        height=450
+    )
+    return fig
+
+
+def goal_figure(leaderboard):
+    # Percent of goal per rep in leaderboard order, best at the top
+    entries = list(reversed(leaderboard))
+    percents = [round(entry['percent'], 1) for entry in entries]
+    labels = [f"#{entry['rank']} {entry['name']}" for entry in entries]
+    text = [f"{entry['percent']:.0f}% | {entry['pace']:,.0f}/day" for entry in entries]
+    colors = ['green' if percent >= 100 else 'orange' for percent in percents]
+    fig = go.Figure(data=[
+        go.Bar(y=labels, x=percents, orientation='h', marker_color=colors, text=text, textposition='auto')
+    ])
+    fig.update_layout(
+        title_text='Goal Progress',
+        title_x=0.5,
+        title_font=dict(size=24, family='Impact, Charcoal, sans-serif'),
+        xaxis={'ticksuffix': '%'},
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font_color='#FFFFFF',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        height=max(300, 40 * len(entries) + 120)
+    )
+    return fig
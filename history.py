@@ -0,0 +1,283 @@
+import argparse
+import datetime
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from storage import NEW_FILE_MODE, get_backend, record_days, to_number
+
+try:
+    import fcntl  # Not available on Windows, where only threads are serialised
+except ImportError:
+    fcntl = None
+
+HISTORY_DIR = 'sales_history'
+ISO_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_WEEK_FILE = re.compile(r'^(\d{4})-W(\d{2})\.npz$')
+BOARD_WEEK_FILE = 'board_week'  # The week the live board holds, e.g. "2026-W42 date"
+
+
+def iso_week(day=None):
+    year, week, _ = (day or datetime.date.today()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _parse_week(week):
+    year, number = week.split('-W')
+    return int(year), int(number)
+
+
+def _next_week(week):
+    return iso_week(datetime.date.fromisocalendar(*_parse_week(week), 1) + datetime.timedelta(days=7))
+
+
+class SalesHistory:
+    # Archive of the board, one small .npz per ISO week holding the rep names
+    # and a reps x days float array. Queries run against an in-memory
+    # cube (weeks x reps x days) that is only rebuilt for partitions that changed
+    # on disk, so rollups over years of history are a few NumPy reductions.
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._partitions = {}  # week -> (signature, names, days, amounts)
+        self._cube = None
+        self._signature = None
+
+    def _path(self, week):
+        return os.path.join(self.directory, f"{week}.npz")
+
+    def record_week(self, rows, days, week=None):
+        # Snapshot the table as the figures for `week` (default: this week),
+        # replacing whatever that week had. For archiving by hand; saves go
+        # through record_board.
+        week = week or iso_week()
+        names = np.array([str(row.get('Name')) for row in rows])
+        amounts = np.array([[to_number(row.get(day)) for day in days] for row in rows], dtype=np.float64).reshape(len(rows), len(days))
+        with self._write_lock():
+            self._write(week, names, days, amounts)
+        return week
+
+    def record_board(self, rows, days, today=None):
+        # Store the live board, exactly as saved, as the week it holds. The
+        # board is reused week after week, so that week only moves forward:
+        # - on the first save in a new ISO week; the week before keeps what it
+        #   had at its last save and no save writes it again
+        # - when the board is reset (every cell zero); the week it held is
+        #   closed as it stands and the board holds the next week from then on
+        # A reset in a week that was only opened by the date means the board
+        # still had last week's numbers on it, so that week starts over.
+        this_week = iso_week(today)
+        names = np.array([str(row.get('Name')) for row in rows])
+        amounts = np.array([[to_number(row.get(day)) for day in days] for row in rows], dtype=np.float64).reshape(len(rows), len(days))
+        with self._write_lock():
+            week, opened = self._board_week() or (this_week, 'reset')
+            if _parse_week(week) < _parse_week(this_week):
+                week, opened = this_week, 'date'
+            if not amounts.any():
+                if opened == 'reset' and self._has_sales(week):
+                    # Close the week as it stands; the zeroed board is the next one
+                    week = _next_week(week)
+                    self._set_board_week(week, 'reset')
+                    return week
+                opened = 'reset'
+            self._write(week, names, days, amounts)
+            self._set_board_week(week, opened)
+        return week
+
+    def _has_sales(self, week):
+        try:
+            with np.load(self._path(week)) as archive:
+                return bool(archive['amounts'].any())
+        except FileNotFoundError:
+            return False
+
+    def _board_week(self):
+        # (week, 'date' or 'reset'): the week the board holds and what opened it
+        try:
+            with open(os.path.join(self.directory, BOARD_WEEK_FILE)) as file:
+                week, opened = file.read().split()
+        except (FileNotFoundError, ValueError):
+            return None
+        return week, opened
+
+    def _set_board_week(self, week, opened):
+        if self._board_week() != (week, opened):
+            self._replace(BOARD_WEEK_FILE, lambda file: file.write(f"{week} {opened}\n".encode()))
+
+    @contextmanager
+    def _write_lock(self):
+        # Every worker archives from its own save callback
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, week, names, days, amounts):
+        self._replace(f"{week}.npz", lambda file: np.savez(file, names=names, days=np.array(days), amounts=amounts))
+
+    def _replace(self, name, write):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.' + name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                write(file)
+            os.chmod(tmp_path, NEW_FILE_MODE)  # mkstemp files are 0600
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _scan(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return {}
+        files = {}
+        for entry in entries:
+            if _WEEK_FILE.match(entry.name):
+                stat = entry.stat()
+                files[entry.name[:-4]] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _load(self):
+        # Reload only the partitions whose file changed, then rebuild the cube
+        files = self._scan()
+        signature = tuple(sorted(files.items()))
+        with self._lock:
+            if self._cube is not None and signature == self._signature:
+                return self._cube
+            for week in list(self._partitions):
+                if week not in files:
+                    del self._partitions[week]
+            for week, file_signature in files.items():
+                cached = self._partitions.get(week)
+                if cached is None or cached[0] != file_signature:
+                    with np.load(self._path(week)) as archive:
+                        self._partitions[week] = (file_signature, archive['names'], archive['days'], archive['amounts'])
+            self._cube = self._build_cube()
+            self._signature = signature
+            return self._cube
+
+    def _build_cube(self):
+        weeks = sorted(self._partitions, key=_parse_week)
+        reps = sorted({str(name) for _, names, _, _ in self._partitions.values() for name in names})
+        rep_index = {name: i for i, name in enumerate(reps)}
+        amounts = np.zeros((len(weeks), len(reps), len(ISO_DAYS)))
+        for w, week in enumerate(weeks):
+            _, names, days, values = self._partitions[week]
+            rows = [rep_index[str(name)] for name in names]
+            columns = [ISO_DAYS.index(str(day)) for day in days]
+            amounts[w][np.ix_(rows, columns)] = values
+        dates = np.array([
+            [np.datetime64(datetime.date.fromisocalendar(*_parse_week(week), d + 1)) for d in range(len(ISO_DAYS))]
+            for week in weeks
+        ], dtype='datetime64[D]').reshape(len(weeks), len(ISO_DAYS))
+        return {'weeks': weeks, 'reps': reps, 'rep_index': rep_index, 'amounts': amounts, 'dates': dates}
+
+    # Queries
+
+    def weeks(self):
+        return list(self._load()['weeks'])
+
+    def reps(self):
+        return list(self._load()['reps'])
+
+    def weekly_totals(self, name=None):
+        # {week: total} for one rep, or the whole team when name is None
+        cube = self._load()
+        amounts = cube['amounts']
+        if name is not None:
+            if name not in cube['rep_index']:
+                return {}
+            totals = amounts[:, cube['rep_index'][name], :].sum(axis=1)
+        else:
+            totals = amounts.sum(axis=(1, 2))
+        return dict(zip(cube['weeks'], totals.tolist()))
+
+    def rep_week_totals(self, week):
+        # {name: total} for a single week
+        cube = self._load()
+        if week not in cube['weeks']:
+            return {}
+        totals = cube['amounts'][cube['weeks'].index(week)].sum(axis=1)
+        return dict(zip(cube['reps'], totals.tolist()))
+
+    def totals_between(self, start, end, name=None):
+        # Per-rep totals for start <= day < end ({name: total}), or a single
+        # rep's total when name is given. Works on days, so months and years
+        # split ISO weeks correctly.
+        cube = self._load()
+        if not cube['weeks']:
+            return 0.0 if name is not None else {}
+        mask = (cube['dates'] >= np.datetime64(start, 'D')) & (cube['dates'] < np.datetime64(end, 'D'))
+        if name is not None:
+            if name not in cube['rep_index']:
+                return 0.0
+            return float((cube['amounts'][:, cube['rep_index'][name], :] * mask).sum())
+        totals = np.einsum('wrd,wd->r', cube['amounts'], mask.astype(np.float64))
+        return dict(zip(cube['reps'], totals.tolist()))
+
+    def monthly_totals(self, year, name=None):
+        # {'YYYY-MM': total} for the team, or for one rep
+        cube = self._load()
+        if not cube['weeks']:
+            return {}
+        amounts = cube['amounts']
+        if name is not None:
+            if name not in cube['rep_index']:
+                return {}
+            per_day = amounts[:, cube['rep_index'][name], :]
+        else:
+            per_day = amounts.sum(axis=1)
+        months = cube['dates'].astype('datetime64[M]')
+        in_year = months.astype('datetime64[Y]') == np.datetime64(str(year), 'Y')
+        month_numbers = (months.astype(int) % 12)[in_year]
+        totals = np.bincount(month_numbers, weights=per_day[in_year], minlength=12)
+        return {f"{year}-{m + 1:02d}": float(totals[m]) for m in range(12)}
+
+    def year_to_date(self, as_of=None, name=None):
+        as_of = as_of or datetime.date.today()
+        return self.totals_between(datetime.date(as_of.year, 1, 1), as_of + datetime.timedelta(days=1), name)
+
+    def rows(self):
+        # (week, date, name, day, amount) for every non-zero cell, oldest week first
+        cube = self._load()
+        weeks, reps, amounts, dates = cube['weeks'], cube['reps'], cube['amounts'], cube['dates']
+        for w, r, d in zip(*np.nonzero(amounts)):
+            yield weeks[w], str(dates[w, d]), reps[r], ISO_DAYS[d], float(amounts[w, r, d])
+
+
+history = SalesHistory()
+
+
+def main(argv=None):
+    # Archive the current board by hand, e.g. before zeroing it for a new week
+    parser = argparse.ArgumentParser(description='Sales history archive')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    archive_parser = subparsers.add_parser('archive', help='Snapshot the current board into the archive')
+    archive_parser.add_argument('--week', default=None, help='ISO week such as 2026-W42 (default: this week)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'archive':
+        rows = get_backend().load_sales()
+        days = record_days(rows[0]) if rows else []
+        days = [day for day in ISO_DAYS if day in days]
+        week = history.record_week(rows, days, args.week)
+        print(f"Archived {len(rows)} reps as {week}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from flask import Response, request
+
+from figures import leaderboard_bars
+from static_assets import asset_url, compress_bytes, preferred_encoding
+
+
+KIOSK_URL = '/kiosk'
+KIOSK_DATA_URL = '/kiosk/data'
+# How often a wall screen asks for the board; an unchanged board costs a 304
+KIOSK_POLL_SECONDS = float(os.environ.get('ECS_KIOSK_POLL_SECONDS') or 10)
+# Screens must revalidate every time, but may keep the body between polls
+REVALIDATE = 'no-cache'
+
+
+class KioskSnapshot:
+    # The read-only board for wall screens, serialised once per data version.
+    # A poll with a matching If-None-Match costs two version reads and a string
+    # compare; the board is only rebuilt (from the running aggregates, without
+    # pandas or plotly) when the sales, the incentive text or the day changes.
+
+    def __init__(self, versions, load_aggregates, load_incentive, size):
+        self._versions = versions
+        self._load_aggregates = load_aggregates
+        self._load_incentive = load_incentive
+        self.size = size
+        self._lock = threading.Lock()
+        self._key = None
+        self._tag = None
+        self._bodies = {}  # content encoding ('' for none) -> bytes
+
+    def current_tag(self):
+        # The day is part of the key because pace and per-day targets move with it
+        key = (self._versions(), datetime.date.today().isoformat())
+        with self._lock:
+            if key != self._key:
+                # Strong validator: one tag per byte-identical body
+                self._key = key
+                self._tag = hashlib.sha256(json.dumps(key, default=str).encode('utf-8')).hexdigest()[:20]
+                self._bodies = {}
+            return self._tag
+
+    def body(self, tag, encoding):
+        with self._lock:
+            body = self._bodies.get(encoding) if tag == self._tag else None
+        if body is not None:
+            return body
+        body = json.dumps(self.board(), separators=(',', ':')).encode('utf-8')
+        if encoding:
+            body = compress_bytes(body, encoding)
+        with self._lock:
+            if tag == self._tag:
+                self._bodies[encoding] = body
+        return body
+
+    def board(self):
+        aggregates = self._load_aggregates()
+        top = aggregates.top(self.size)
+        teams = aggregates.team_rollups()
+        names, totals, colors = leaderboard_bars(top, teams, aggregates.team_total)
+        return {
+            'version': aggregates.version,
+            'incentive': self._load_incentive(),
+            'leaderboard': [
+                {'rank': entry['rank'], 'name': entry['name'], 'total': entry['total'],
+                 'goal': entry['goal'], 'percent': round(entry['percent'], 1)}
+                for entry in top
+            ],
+            'teams': [
+                {'team': rollup['team'], 'total': rollup['total'], 'goal': rollup['goal'],
+                 'percent': round(rollup['percent'], 1), 'reps': rollup['reps']}
+                for rollup in teams
+            ],
+            'team': {key: round(value, 1) for key, value in aggregates.team().items()},
+            'bars': {'names': names, 'totals': totals, 'colors': colors},
+        }
+
+
+def _not_modified(tag):
+    # 304s carry the validator and no body
+    response = Response(status=304)
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = REVALIDATE
+    return response
+
+
+def kiosk_page(poll_seconds):
+    # One small self-contained page: no Dash renderer, React or plotly.js.
+    # fetch() with cache 'no-cache' sends If-None-Match on its own and hands
+    # back the stored body on a 304.
+    return KIOSK_HTML.replace('{background}', asset_url('hex_Backg.gif')) \
+        .replace('{data_url}', KIOSK_DATA_URL).replace('{poll_ms}', str(int(poll_seconds * 1000)))
+
+
+def register_kiosk(server, versions, load_aggregates, load_incentive, size, poll_seconds=KIOSK_POLL_SECONDS):
+    # versions() must be cheap (the snapshot headers); it runs on every poll
+    snapshot = KioskSnapshot(versions, load_aggregates, load_incentive, size)
+    page = {}
+
+    @server.route(KIOSK_URL)
+    def kiosk():
+        if not page:
+            html = kiosk_page(poll_seconds).encode('utf-8')
+            page['tag'] = hashlib.sha256(html).hexdigest()[:20]
+            page['html'] = html
+        if request.if_none_match.contains(page['tag']):
+            return _not_modified(page['tag'])
+        response = Response(page['html'], mimetype='text/html')
+        response.set_etag(page['tag'])
+        response.headers['Cache-Control'] = REVALIDATE
+        return response
+
+    @server.route(KIOSK_DATA_URL)
+    def kiosk_data():
+        encoding = preferred_encoding() or ''
+        # Each encoding is its own representation, so it gets its own strong tag
+        tag = snapshot.current_tag() + (f'-{encoding}' if encoding else '')
+        if request.if_none_match.contains(tag):
+            return _not_modified(tag)
+        response = Response(snapshot.body(tag, encoding), mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(tag)
+        response.headers['Cache-Control'] = REVALIDATE
+        return response
+
+    return kiosk_data
+
+
+KIOSK_HTML = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ECS Sales</title>
+<style>
+body { margin: 0; font-family: sans-serif; color: white; background: #222 url("{background}"); background-size: cover; }
+#incentive { margin: 2vh 3vw; padding: 2vh 2vw; background: rgba(255, 120, 0, 0.65); border-radius: 10px; font-size: 3vh; white-space: pre-wrap; }
+#board { display: flex; gap: 3vw; margin: 0 3vw; }
+table { border-collapse: collapse; font-size: 2.6vh; background: rgba(255, 255, 255, 0.5); color: black; }
+td, th { padding: 0.6vh 1.2vw; text-align: right; }
+td:nth-child(2), th:nth-child(2) { text-align: left; }
+#bars { flex: 1; font-size: 2.2vh; }
+.bar { display: flex; align-items: center; margin: 0.4vh 0; }
+.bar span { width: 12vw; }
+.bar div { height: 2.4vh; margin-right: 0.6vw; }
+#status { position: fixed; bottom: 1vh; right: 1vw; font-size: 1.4vh; opacity: 0.6; }
+</style>
+</head>
+<body>
+<div id="incentive"></div>
+<div id="board">
+<table><thead><tr><th>#</th><th>Name</th><th>Total</th><th>Goal</th><th>%</th></tr></thead><tbody id="leaders"></tbody></table>
+<div id="bars"></div>
+</div>
+<div id="status"></div>
+<script>
+function cell(row, text) { var td = document.createElement('td'); td.textContent = text; row.appendChild(td); }
+function show(board) {
+    document.getElementById('incentive').textContent = board.incentive;
+    var leaders = document.getElementById('leaders');
+    leaders.textContent = '';
+    board.leaderboard.forEach(function (entry) {
+        var row = document.createElement('tr');
+        [entry.rank, entry.name, entry.total, entry.goal, entry.percent + '%'].forEach(function (text) { cell(row, text); });
+        leaders.appendChild(row);
+    });
+    var bars = document.getElementById('bars');
+    var most = Math.max.apply(null, board.bars.totals.concat([1]));
+    bars.textContent = '';
+    board.bars.names.forEach(function (name, i) {
+        var bar = document.createElement('div'), label = document.createElement('span'), fill = document.createElement('div');
+        bar.className = 'bar';
+        label.textContent = name;
+        fill.style.width = (60 * board.bars.totals[i] / most) + 'vw';
+        fill.style.background = board.bars.colors[i];
+        bar.appendChild(label);
+        bar.appendChild(fill);
+        bar.appendChild(document.createTextNode(board.bars.totals[i]));
+        bars.appendChild(bar);
+    });
+}
+var seen = null;
+function poll() {
+    fetch('{data_url}', {cache: 'no-cache'}).then(function (response) {
+        document.getElementById('status').textContent = new Date().toLocaleTimeString();
+        var tag = response.headers.get('ETag');
+        if (tag === seen) { return; }
+        return response.json().then(function (board) { seen = tag; show(board); });
+    }).catch(function () {
+        document.getElementById('status').textContent = 'offline';
+    }).then(function () { setTimeout(poll, {poll_ms}); });
+}
+poll();
+</script>
+</body>
+</html>
+'''
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+
+from flask import Response, request, stream_with_context
+
+from storage import get_backend
+
+
+# What the dashboards care about, keyed by the name used in the change messages.
+# Each source returns a version string that is the same in every worker.
+VERSION_SOURCES = {
+    'sales': lambda: get_backend().sales_version(),
+    'incentive': lambda: get_backend().incentive_version(),
+}
+POLL_SECONDS = 0.5  # How often the watcher thread checks the versions
+KEEPALIVE_SECONDS = 20  # Comment line sent on idle streams so proxies don't drop them
+# Streams end after this long and the browser reconnects (after the retry:
+# delay), so no connection holds a worker thread forever
+STREAM_SECONDS = float(os.environ.get('ECS_STREAM_SECONDS') or 300)
+# 'auto' turns push off on servers that handle one request at a time per
+# worker (gunicorn's default sync worker), where a stream would take the whole
+# worker; screens then poll. 'on' or 'off' force it.
+LIVE_UPDATES = os.environ.get('ECS_LIVE_UPDATES', 'auto').lower()
+EVENTS_URL = '/sales-events'
+
+
+class ChangeWatcher:
+    # One thread per worker watches the data versions and wakes every open
+    # stream when one of them changes. Idle screens just sit in wait_for_change.
+
+    def __init__(self, sources, poll_seconds=POLL_SECONDS):
+        self.sources = dict(sources)
+        self.poll_seconds = poll_seconds
+        self._condition = threading.Condition()
+        self._versions = None
+        self._thread = None
+        self._pid = None
+
+    def versions(self):
+        with self._condition:
+            if self._versions is None:
+                self._versions = self._current()
+            return dict(self._versions)
+
+    def _current(self):
+        return {key: source() for key, source in self.sources.items()}
+
+    def check(self):
+        # Re-read the versions and wake the streams if anything moved. Also called
+        # straight after a save so screens on this worker don't wait for a poll.
+        current = self._current()
+        with self._condition:
+            if current != self._versions:
+                self._versions = current
+                self._condition.notify_all()
+        return current
+
+    def start(self):
+        # Started lazily from the first stream rather than at import time, so a
+        # thread created before gunicorn forks isn't mistaken for a live one
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='sales-change-watcher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"error watching sales data: {e}")
+
+    def wait_for_change(self, seen, timeout):
+        with self._condition:
+            self._condition.wait_for(lambda: self._versions != seen, timeout)
+            return dict(self._versions)
+
+
+watcher = ChangeWatcher(VERSION_SOURCES)
+
+
+def _event(versions):
+    return f"event: change\ndata: {json.dumps(versions)}\n\n"
+
+
+def stream_changes(change_watcher=watcher, keepalive=KEEPALIVE_SECONDS, lifetime=STREAM_SECONDS):
+    change_watcher.start()
+    seen = change_watcher.versions()
+    deadline = time.monotonic() + lifetime
+    # The first message carries the current versions so a reconnecting screen
+    # catches up on anything it missed while it was disconnected
+    yield 'retry: 3000\n\n'
+    yield _event(seen)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return  # EventSource reconnects by itself
+        current = change_watcher.wait_for_change(seen, min(keepalive, remaining))
+        if current == seen:
+            yield ': keepalive\n\n'
+        else:
+            seen = current
+            yield _event(current)
+
+
+def push_enabled(environ, mode=LIVE_UPDATES):
+    if mode in ('on', 'off'):
+        return mode == 'on'
+    return bool(environ.get('wsgi.multithread'))
+
+
+def register_live_updates(server, change_watcher=watcher):
+    # Server-Sent Events endpoint on the Flask server behind Dash. Each open
+    # stream holds a worker thread for up to STREAM_SECONDS, so under gunicorn
+    # use a threaded worker class (e.g. --worker-class gthread --threads 50).
+    @server.route(EVENTS_URL)
+    def sales_events():
+        if not push_enabled(request.environ):
+            # 204 tells EventSource not to reconnect; the page keeps polling
+            return Response(status=204)
+        return Response(
+            stream_with_context(stream_changes(change_watcher)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
+    return sales_events
@@ -0,0 +1,179 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+
+METRICS_URL = '/metrics'
+CALLBACK_URL = '/_dash-update-component'
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Log callbacks slower than this many milliseconds, with what triggered them; unset = off
+SLOW_CALLBACK_MS = float(os.environ.get('ECS_SLOW_CALLBACK_MS') or 0)
+
+
+class Histogram:
+    # Cumulative Prometheus-style buckets; observe() is a bisect and two adds
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    # Counters and histograms for one process. Each gunicorn worker keeps its
+    # own, and every series has a pid label so a scrape can tell them apart.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self):
+        # Prometheus text exposition format
+        pid = ('pid', str(os.getpid()))
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (h.buckets, list(h.counts), h.sum, h.count)) for key, h in self._histograms.items())
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f"{name}{_labels(labels + (pid,))} {value}")
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (pid, ('le', le)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels + (pid,))} {total}")
+            lines.append(f"{name}_count{_labels(labels + (pid,))} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{_label_value(value)}"' for key, value in labels) + '}'
+
+
+metrics = Metrics()
+metrics.describe('ecs_callback_requests_total', 'counter', 'Dash callback requests')
+metrics.describe('ecs_callback_errors_total', 'counter', 'Dash callback requests that did not return 200/204')
+metrics.describe('ecs_callback_duration_seconds', 'histogram', 'Time to serve a Dash callback request')
+metrics.describe('ecs_callback_request_bytes', 'histogram', 'Dash callback request body size')
+metrics.describe('ecs_callback_response_bytes', 'histogram', 'Dash callback response size before compression')
+metrics.describe('ecs_storage_duration_seconds', 'histogram', 'Time spent reading or writing sales and incentive data')
+metrics.describe('ecs_storage_errors_total', 'counter', 'Storage reads or writes that raised')
+
+
+def timed(operation):
+    # Decorator for the load/save helpers
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.inc('ecs_storage_errors_total', (('operation', operation),))
+                raise
+            finally:
+                metrics.observe('ecs_storage_duration_seconds', time.perf_counter() - started, (('operation', operation),))
+        return wrapper
+    return decorate
+
+
+def _callback_names(app):
+    # callback_map key -> function name, e.g. '..sales-table.data...' -> 'refresh_sales_data'
+    return {key: spec['callback'].__name__ for key, spec in app.callback_map.items() if 'callback' in spec}
+
+
+def _trigger(body):
+    # The changed inputs and their values, shortened for the log
+    changed = set(body.get('changedPropIds') or [])
+    values = {
+        f"{item.get('id')}.{item.get('property')}": item.get('value')
+        for item in body.get('inputs') or [] if isinstance(item, dict)
+    }
+    trigger = {prop: values.get(prop) for prop in changed}
+    text = json.dumps(trigger, default=str)
+    return text if len(text) <= 200 else text[:197] + '...'
+
+
+def register_metrics(app, slow_callback_ms=SLOW_CALLBACK_MS):
+    # Time every server callback request and serve everything at /metrics
+    server = app.server
+    names = {}
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path == CALLBACK_URL:
+            g.callback_started = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        started = g.pop('callback_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        body = request.get_json(silent=True) or {}
+        output = body.get('output')
+        if output not in names:
+            names.update(_callback_names(app))
+        labels = (('callback', names.get(output, 'unknown')),)
+        metrics.inc('ecs_callback_requests_total', labels)
+        if response.status_code not in (200, 204):
+            metrics.inc('ecs_callback_errors_total', labels)
+        metrics.observe('ecs_callback_duration_seconds', elapsed, labels)
+        metrics.observe('ecs_callback_request_bytes', request.content_length or 0, labels, SIZE_BUCKETS)
+        if not response.direct_passthrough:
+            metrics.observe('ecs_callback_response_bytes', response.calculate_content_length() or 0, labels, SIZE_BUCKETS)
+        if slow_callback_ms and elapsed * 1000 >= slow_callback_ms:
+            print(f"slow callback {labels[0][1]}: {elapsed * 1000:.1f} ms, triggered by {_trigger(body)}")
+        return response
+
+    @server.route(METRICS_URL)
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    return metrics_endpoint
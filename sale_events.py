@@ -0,0 +1,60 @@
+import threading
+from collections import deque
+
+from flask import jsonify, request
+
+from storage import SALE_EVENT_LIMIT, get_backend
+
+
+class SaleEventLog:
+    # Per-worker copy of the persisted "got a sale" log. It is only reloaded
+    # when the backend's event version moves, so asking for new events on an
+    # idle tick is a version check and a short scan of the ring buffer.
+
+    def __init__(self, backend_getter=get_backend, size=SALE_EVENT_LIMIT):
+        self._backend_getter = backend_getter
+        self._events = deque(maxlen=size)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        backend = self._backend_getter()
+        version = backend.sale_events_version()
+        with self._lock:
+            if version is None or version == self._version:
+                return
+        events = backend.load_sale_events()
+        with self._lock:
+            self._events.clear()
+            self._events.extend(events)
+            self._version = version
+
+    def last_seq(self):
+        self._refresh()
+        with self._lock:
+            return self._events[-1]['seq'] if self._events else 0
+
+    def since(self, seq):
+        # Events newer than seq, oldest first
+        self._refresh()
+        with self._lock:
+            return [event for event in self._events if event['seq'] > seq]
+
+    def recent(self, limit=20):
+        self._refresh()
+        with self._lock:
+            return list(self._events)[-limit:]
+
+
+sale_event_log = SaleEventLog()
+
+
+def register_sale_events(server, log=sale_event_log):
+    # Ordered recent sales for tickers: GET /sale-events?after=<seq>
+    @server.route('/sale-events')
+    def sale_events():
+        after = request.args.get('after', type=int)
+        events = log.recent() if after is None else log.since(after)
+        return jsonify({'last_seq': log.last_seq(), 'events': events})
+
+    return sale_events
@@ -0,0 +1,73 @@
+import numpy as np
+
+from storage import DEFAULT_GOAL, to_number
+from tiers import tier_field, tiers
+
+
+def day_matrix(rows, days):
+    # reps x days as floats; only falls back to per-cell coercion when the
+    # table holds something numpy can't parse (e.g. a half-typed edit)
+    values = [[row.get(day) for day in days] for row in rows]
+    try:
+        matrix = np.array(values, dtype=float).reshape(len(rows), len(days))
+    except (TypeError, ValueError):
+        matrix = np.array([[to_number(value) for value in row] for row in values], dtype=float).reshape(len(rows), len(days))
+    return np.nan_to_num(matrix, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def goal_array(rows):
+    # Same fallback as day_matrix, for files that haven't been normalized yet
+    # ("Goal": "" or "1,000" or null); a missing goal is the default
+    goals = [row.get('Goal', DEFAULT_GOAL) for row in rows]
+    try:
+        array = np.array(goals, dtype=float)
+    except (TypeError, ValueError):
+        array = np.array([to_number(goal) for goal in goals], dtype=float)
+    return np.nan_to_num(array, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def plain_numbers(array):
+    # Keep whole numbers as ints so the bar labels don't read "2500.0"
+    if np.all(np.mod(array, 1) == 0):
+        return array.astype(np.int64).tolist()
+    return array.tolist()
+
+
+class SalesBoard:
+    # The board as arrays: a reps x days matrix of amounts plus names, teams,
+    # goals and row versions per rep. Storage writes rows already normalized
+    # (see storage.normalize_row), so building one is an np.array per field
+    # instead of a DataFrame and a to_numeric pass over every column.
+
+    def __init__(self, rows, days):
+        self.days = list(days)
+        self.names = [row['Name'] for row in rows]
+        self.teams = [row.get('Team') or '' for row in rows]
+        self.amounts = day_matrix(rows, self.days)
+        self.totals = self.amounts.sum(axis=1)
+        self.goals = goal_array(rows)
+        self.versions = np.array([row.get('Version', 0) for row in rows], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def records(self):
+        # Rows for the DataTable: the stored fields, the Total and each numeric
+        # cell's tier. Columns of whole numbers come out as ints.
+        if not self.names:
+            return []
+        columns = self.days + ['Total']
+        values = np.column_stack([self.amounts, self.totals])
+        cells = list(zip(*[plain_numbers(values[:, i]) for i in range(len(columns))]))
+        fields = columns + [tier_field(column) for column in columns]
+        goals = plain_numbers(self.goals)
+        versions = self.versions.tolist()
+        has_teams = any(self.teams)  # Only some reps may have a team; the rest get ''
+        records = []
+        for i, (name, row_tiers) in enumerate(zip(self.names, tiers(values).tolist())):
+            record = {'Name': name, 'Team': self.teams[i]} if has_teams else {'Name': name}
+            record.update(zip(fields, cells[i] + tuple(row_tiers)))
+            record['Goal'] = goals[i]
+            record['Version'] = versions[i]
+            records.append(record)
+        return records
@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl  # Not available on Windows, where only threads are serialised
+except ImportError:
+    fcntl = None
+
+
+MAGIC = b'ECSSNAP1'
+# magic, sequence number (odd while a write is in progress), payload length
+HEADER = struct.Struct('<8sQQ')
+MIN_FILE_SIZE = 64 * 1024
+RECHECK_SECONDS = 5.0  # How often a worker checks for writes made outside the app
+
+
+class SharedSnapshot:
+    # A memory-mapped file shared by every gunicorn worker on the host. The
+    # worker that saves publishes the parsed value once. Every other worker
+    # reads the sequence number from the mapped header, which is a memory read
+    # with no syscall or parse, and only decodes the payload when it changes.
+
+    def __init__(self, path, recheck_seconds=RECHECK_SECONDS):
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._pid = None
+        self._seen_seq = None
+        self._value = None
+        self._checked_at = None
+
+    def _open(self):
+        # One mapping per process; reopened after a fork or when the file grew
+        if self._map is not None and self._pid == os.getpid():
+            return
+        self._close()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._file = os.fdopen(fd, 'r+b')
+        if os.fstat(fd).st_size < MIN_FILE_SIZE:
+            with self._file_lock():
+                if os.fstat(fd).st_size < MIN_FILE_SIZE:
+                    self._file.truncate(MIN_FILE_SIZE)
+        self._map = mmap.mmap(fd, os.fstat(fd).st_size)
+        self._pid = os.getpid()
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def read(self):
+        # (version, value) as last published, or None if nothing valid is there
+        with self._lock:
+            self._open()
+            for _ in range(100):
+                magic, seq, length = HEADER.unpack_from(self._map, 0)
+                if magic != MAGIC:
+                    return None
+                if seq == self._seen_seq:
+                    return self._value
+                if seq % 2:
+                    time.sleep(0.0005)  # A writer is halfway through
+                    continue
+                if HEADER.size + length > len(self._map):
+                    self._map.close()
+                    self._map = None
+                    self._open()
+                    continue
+                payload = self._map[HEADER.size:HEADER.size + length]
+                if HEADER.unpack_from(self._map, 0)[1] != seq:
+                    continue  # Overwritten while we were copying it
+                data = json.loads(payload)
+                self._seen_seq = seq
+                self._value = (data['version'], data['value'])
+                return self._value
+            return None
+
+    def publish(self, version, value, current_version=None):
+        # Returns False, leaving the snapshot alone, if current_version() shows
+        # the backend has moved past `version`: a worker that read before
+        # another one saved mustn't overwrite the newer snapshot with its
+        # older value. The check runs under the file lock, so it can't
+        # interleave with that worker's publish.
+        payload = json.dumps({'version': version, 'value': value}).encode()
+        needed = HEADER.size + len(payload)
+        with self._lock:
+            self._open()
+            with self._file_lock():
+                if current_version is not None and current_version() != version:
+                    return False
+                if needed > len(self._map):
+                    self._map.close()
+                    self._file.truncate(max(needed * 2, MIN_FILE_SIZE))
+                    self._map = mmap.mmap(self._file.fileno(), os.fstat(self._file.fileno()).st_size)
+                magic, seq, _ = HEADER.unpack_from(self._map, 0)
+                if magic != MAGIC:
+                    seq = 0
+                writing = seq if seq % 2 else seq + 1  # Odd; a crashed writer may have left it odd already
+                HEADER.pack_into(self._map, 0, MAGIC, writing, 0)
+                self._map[HEADER.size:needed] = payload
+                HEADER.pack_into(self._map, 0, MAGIC, writing + 1, len(payload))
+            self._seen_seq = writing + 1
+            self._value = (version, value)
+            self._checked_at = time.monotonic()
+        return True
+
+    def get(self, current_version, load, expected=None):
+        # Shared value, confirming it against the backend at most every
+        # recheck_seconds so edits made outside the app still show up.
+        # load() returns (version, value) straight from the backend.
+        # expected is a version somebody already saw in the backend (e.g. one
+        # the change stream pushed); if the snapshot doesn't have it yet, ask
+        # the backend now instead of waiting for the next recheck.
+        shared = self.read()
+        now = time.monotonic()
+        recent = self._checked_at is not None and now - self._checked_at < self.recheck_seconds
+        if shared is not None and recent and (expected is None or shared[0] == expected):
+            return shared
+        if shared is None or shared[0] != current_version():
+            shared = load()
+            if not self.publish(*shared, current_version):
+                return shared  # Already outdated; check the backend again next time
+        self._checked_at = now
+        return shared
+
+    def refresh(self, load, current_version=None):
+        # Called by the worker that just saved: parse once, share with everyone
+        shared = load()
+        self.publish(*shared, current_version)
+        return shared
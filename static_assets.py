@@ -0,0 +1,156 @@
+import argparse
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import abort, request, send_from_directory
+
+try:
+    import brotli  # Optional; gzip is used when it isn't installed
+except ImportError:
+    brotli = None
+
+
+HASHED_URL = '/hashed-assets'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'application/javascript', 'text/javascript'}
+MIN_COMPRESS_BYTES = 500
+# Lighter sibling to serve instead of the original when one has been generated
+LIGHTER_FORMATS = {'.gif': '.webp', '.jpg': '.webp', '.jpeg': '.webp', '.png': '.webp'}
+
+_assets_folder = None
+_hashes = {}
+_hashes_lock = threading.Lock()
+# Dash's component bundles have the package version in their URL, so their
+# compressed bytes can be kept instead of recompressing plotly.js per request
+_compressed_bundles = OrderedDict()
+_compressed_bundles_lock = threading.Lock()
+_BUNDLE_CACHE_SIZE = 64
+
+
+def _file_hash(name):
+    with _hashes_lock:
+        if name not in _hashes:
+            digest = hashlib.sha256()
+            with open(os.path.join(_assets_folder, name), 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 16), b''):
+                    digest.update(chunk)
+            _hashes[name] = digest.hexdigest()[:12]
+        return _hashes[name]
+
+
+def asset_url(name):
+    # Content-hashed URL for a file in assets/, e.g. /hashed-assets/hex_Backg.3f2a9c1d0b4e.webp.
+    # Falls back to the plain /assets/ URL if the file is missing.
+    base, ext = os.path.splitext(name)
+    lighter = base + LIGHTER_FORMATS.get(ext.lower(), ext)
+    if lighter != name and os.path.exists(os.path.join(_assets_folder, lighter)):
+        name, ext = lighter, os.path.splitext(lighter)[1]
+    if not os.path.exists(os.path.join(_assets_folder, name)):
+        return f"/assets/{name}"
+    return f"{HASHED_URL}/{base}.{_file_hash(name)}{ext}"
+
+
+def preferred_encoding():
+    # Highest q-value the client gives us (brotli wins a tie); q=0 means "not this one"
+    accepted = request.accept_encodings
+    offers = [('br', accepted['br'])] if brotli is not None else []
+    offers.append(('gzip', accepted['gzip']))
+    encoding, quality = max(offers, key=lambda offer: offer[1])
+    return encoding if quality > 0 else None
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_response(response):
+    # gzip/brotli for callback, layout and bundle responses. Streams (the SSE
+    # endpoint) and files are left alone.
+    if response.direct_passthrough or response.is_streamed or response.status_code != 200:
+        return response
+    if 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    encoding = preferred_encoding()
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    if request.path.startswith('/_dash-component-suites/'):
+        key = (request.full_path, encoding)
+        with _compressed_bundles_lock:
+            body = _compressed_bundles.get(key)
+        if body is None:
+            body = compress_bytes(data, encoding)  # Outside the lock; a duplicate compress is harmless
+            with _compressed_bundles_lock:
+                _compressed_bundles[key] = body
+                while len(_compressed_bundles) > _BUNDLE_CACHE_SIZE:
+                    _compressed_bundles.popitem(last=False)
+    else:
+        body = compress_bytes(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def register_static_assets(server, assets_folder):
+    global _assets_folder
+    _assets_folder = assets_folder
+
+    @server.route(f"{HASHED_URL}/<path:filename>")
+    def hashed_asset(filename):
+        # name.<hash>.ext -> name.ext, only served while the hash still matches
+        base, ext = os.path.splitext(filename)
+        name, _, digest = base.rpartition('.')
+        original = name + ext
+        if not name or not os.path.exists(os.path.join(_assets_folder, original)) or _file_hash(original) != digest:
+            abort(404)
+        response = send_from_directory(_assets_folder, original, max_age=31536000)
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    @server.after_request
+    def cache_and_compress(response):
+        # Dash links its own CSS/JS as /assets/file?m=<mtime>, which is just as safe to cache forever
+        if request.path.startswith('/assets/') and 'm' in request.args and response.status_code == 200:
+            response.headers['Cache-Control'] = IMMUTABLE
+        return compress_response(response)
+
+    return hashed_asset
+
+
+def main(argv=None):
+    # Optional: write WebP versions of the images next to the originals.
+    # asset_url picks them up automatically. Needs Pillow.
+    parser = argparse.ArgumentParser(description='Static asset tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    optimize_parser = subparsers.add_parser('optimize', help='Generate lighter WebP versions of the images')
+    optimize_parser.add_argument('--assets', default='assets')
+    optimize_parser.add_argument('--quality', type=int, default=80)
+    args = parser.parse_args(argv)
+
+    if args.command == 'optimize':
+        try:
+            from PIL import Image
+        except ImportError:
+            parser.exit(1, "Pillow is required for 'optimize' (pip install Pillow)\n")
+        for name in sorted(os.listdir(args.assets)):
+            base, ext = os.path.splitext(name)
+            if ext.lower() not in LIGHTER_FORMATS:
+                continue
+            source = os.path.join(args.assets, name)
+            target = os.path.join(args.assets, base + LIGHTER_FORMATS[ext.lower()])
+            with Image.open(source) as image:
+                animated = getattr(image, 'is_animated', False)
+                image.save(target, 'WEBP', quality=args.quality, save_all=animated, method=6)
+            print(f"{name}: {os.path.getsize(source)} -> {os.path.getsize(target)} bytes ({os.path.basename(target)})")
+
+
+if __name__ == '__main__':
+    main()
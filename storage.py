@@ -0,0 +1,638 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl  # Not available on Windows, where we fall back to an in-process lock
+except ImportError:
+    fcntl = None
+
+
+SALES_FILE = 'sales_data.json'
+INCENTIVE_FILE = 'incentive_data.json'
+USERS_FILE = 'users.json'  # {email: 'full' or 'limited'}
+SQLITE_FILE = 'sales_data.db'
+SALE_EVENTS_FILE = 'sale_events.json'
+SALE_EVENT_LIMIT = 200  # How many "got a sale" events the log keeps
+# Keys in a sales record that are not day columns. Version is the row version
+# used for optimistic concurrency: it goes up every time one of the rep's cells changes.
+# Team is optional and groups reps for the rollups on the board.
+RECORD_FIELDS = ('Name', 'Team', 'Goal', 'Total', 'Version')
+# Display-only fields the app derives per column (e.g. Monday_tier); never stored
+TIER_SUFFIX = '_tier'
+DEFAULT_GOAL = 50000
+NEW_FILE_MODE = 0o644  # Data files we create; existing files keep their own mode
+
+
+def file_version(path):
+    # inode + mtime + size is the same in every worker, so a screen that reconnects to a
+    # different gunicorn worker doesn't see a bogus change
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def to_number(value):
+    # Same rules the table has always used: anything that isn't a number counts as 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        try:
+            number = float(str(value).strip())
+        except (TypeError, ValueError):
+            return 0
+    if number != number or number in (float('inf'), float('-inf')):
+        return 0
+    return int(number) if float(number).is_integer() else number
+
+
+def record_days(record):
+    return [key for key in record if key not in RECORD_FIELDS and not key.endswith(TIER_SUFFIX)]
+
+
+def normalize_row(row, days=None):
+    # The stored shape of a rep: Name, Team (only when set), a number per day,
+    # Goal and Version. Values are coerced here, once, when they are written,
+    # so readers can take the numbers as they are. Derived fields such as
+    # Total and Monday_tier are dropped.
+    name = row.get('Name')
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"sales row without a name: {row!r}")
+    record = {'Name': name}
+    if row.get('Team'):
+        record['Team'] = str(row['Team'])
+    for day in record_days(row) if days is None else days:
+        record[day] = to_number(row.get(day))
+    record['Goal'] = to_number(row.get('Goal', DEFAULT_GOAL))
+    record['Version'] = int(to_number(row.get('Version', 0)))
+    return record
+
+
+def normalize_rows(rows):
+    return [normalize_row(row) for row in rows]
+
+
+def row_total(row):
+    return sum(to_number(row.get(day)) for day in record_days(row))
+
+
+def sale_increases(before, after):
+    # before/after: {name: total}. A sale is any rep whose total went up.
+    return [
+        (name, total - before[name], total)
+        for name, total in after.items()
+        if name in before and total > before[name]
+    ]
+
+
+def _apply_row_edit(row, cells, expected_version):
+    # Shared by the backends: apply {day: value} to a stored row unless someone
+    # else changed the row since the editor loaded it. Returns True if applied.
+    if expected_version is not None and row.get('Version', 0) != expected_version:
+        return False
+    changed = False
+    for day, value in cells.items():
+        value = to_number(value)
+        if to_number(row.get(day)) != value:
+            row[day] = value
+            changed = True
+    if changed:
+        row['Version'] = row.get('Version', 0) + 1
+    return True
+
+
+class JsonBackend:
+    # The original storage: one JSON file for the table, one for the incentive
+    # text. Writes go to a temp file that replaces the old one, so readers always
+    # see a whole file, and a lock file serialises writers across workers.
+
+    def __init__(self, sales_file=SALES_FILE, incentive_file=INCENTIVE_FILE, events_file=SALE_EVENTS_FILE, users_file=USERS_FILE):
+        self.sales_file = sales_file
+        self.incentive_file = incentive_file
+        self.events_file = events_file
+        self.users_file = users_file
+        self._thread_lock = threading.Lock()
+
+    def sales_version(self):
+        return file_version(self.sales_file)
+
+    def incentive_version(self):
+        return file_version(self.incentive_file)
+
+    def sale_events_version(self):
+        return file_version(self.events_file)
+
+    @contextmanager
+    def _write_lock(self, path):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, path):
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def _write(self, path, data):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file, indent=4)
+            # mkstemp files are 0600; keep the old file's mode (or the usual one for a new file)
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = NEW_FILE_MODE
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_sales(self):
+        try:
+            rows = self._read(self.sales_file)
+        except FileNotFoundError:
+            return []
+        for row in rows:
+            row.setdefault('Version', 0)
+        return rows
+
+    def _totals(self, rows):
+        return {row.get('Name'): row_total(row) for row in rows}
+
+    def _record_sales(self, before, rows):
+        # Called under the sales lock, which also covers the events file, and
+        # before the sales file is replaced: a screen told about the new sales
+        # version must already find its events
+        increases = sale_increases(before, self._totals(rows))
+        if not increases:
+            return
+        try:
+            log = self._read(self.events_file)
+        except FileNotFoundError:
+            log = {'last_seq': 0, 'events': []}
+        now = time.time()
+        for name, amount, total in increases:
+            log['last_seq'] += 1
+            log['events'].append({'seq': log['last_seq'], 'name': name, 'amount': amount, 'total': total, 'time': now})
+        log['events'] = log['events'][-SALE_EVENT_LIMIT:]
+        self._write(self.events_file, log)
+
+    def load_sale_events(self):
+        try:
+            return self._read(self.events_file)['events']
+        except FileNotFoundError:
+            return []
+
+    def _load_for_write(self):
+        # Rows from files written before saves were normalized are fixed up
+        # on their way through, so every write leaves a normalized file
+        return normalize_rows(self.load_sales())
+
+    def save_sales(self, rows):
+        # Whole-table save: the board becomes exactly `rows`, in that order.
+        # A rep's version goes up when anything else about it changed, as it
+        # does in SqliteBackend.save_sales.
+        rows = normalize_rows(rows)
+        with self._write_lock(self.sales_file):
+            stored = {row['Name']: row for row in self._load_for_write()}
+            before = self._totals(stored.values())
+            for row in rows:
+                old = stored.get(row['Name'])
+                if old is not None:
+                    row['Version'] = old['Version'] + (dict(old, Version=0) != dict(row, Version=0))
+            self._record_sales(before, rows)
+            self._write(self.sales_file, rows)
+
+    def apply_edits(self, edits):
+        # edits: (name, {day or 'Goal': value}, expected_version). Every edit is checked
+        # against the row version and the file is written once for the batch.
+        # Returns {name: (applied, stored_row)}.
+        with self._write_lock(self.sales_file):
+            rows = self._load_for_write()
+            before = self._totals(rows)
+            by_name = {row.get('Name'): row for row in rows}
+            results = {}
+            for name, cells, expected_version in edits:
+                if name not in by_name:
+                    continue
+                results[name] = (_apply_row_edit(by_name[name], cells, expected_version), by_name[name])
+            if any(applied for applied, _ in results.values()):
+                self._record_sales(before, rows)
+                self._write(self.sales_file, rows)
+            return results
+
+    def bulk_update(self, updates, days):
+        # updates: {name: {day, 'Goal' or 'Team': value}} from an import. One
+        # write for the whole batch, reps missing from the board are added, and
+        # no sale events are logged. Returns (reps changed, reps added).
+        with self._write_lock(self.sales_file):
+            rows = self._load_for_write()
+            by_name = {row.get('Name'): row for row in rows}
+            changed = added = 0
+            for name, fields in updates.items():
+                row = by_name.get(name)
+                is_new = row is None
+                if is_new:
+                    row = by_name[name] = {'Name': name, **{day: 0 for day in days}, 'Goal': DEFAULT_GOAL, 'Version': 0}
+                    rows.append(row)
+                    added += 1
+                fields = dict(fields)
+                team = fields.pop('Team', None)
+                version = row.get('Version', 0)
+                _apply_row_edit(row, fields, None)
+                if team is not None and row.get('Team') != team:
+                    row['Team'] = team
+                    row['Version'] = version + 1
+                if is_new or row.get('Version', 0) != version:
+                    changed += 1
+            if changed or added:
+                self._write(self.sales_file, rows)
+            return changed, added
+
+    def normalize(self):
+        # One-off migration: rewrite a sales file from before saves were
+        # normalized ("Tuesday": "0" next to "Monday": 0). Returns the number
+        # of reps whose stored form changed; the file is left alone if none did.
+        with self._write_lock(self.sales_file):
+            try:
+                rows = self._read(self.sales_file)
+            except FileNotFoundError:
+                return 0
+            normalized = normalize_rows(rows)
+            changed = sum(1 for row, record in zip(rows, normalized) if json.dumps(row) != json.dumps(record))
+            if changed:
+                self._write(self.sales_file, normalized)
+            return changed
+
+    def load_incentive(self):
+        try:
+            return self._read(self.incentive_file).get('incentive_text', '')
+        except FileNotFoundError:
+            return ''
+
+    def save_incentive(self, text):
+        with self._write_lock(self.incentive_file):
+            self._write(self.incentive_file, {'incentive_text': text})
+
+    def load_users(self):
+        # {email: access level} for everyone allowed to log in
+        try:
+            return self._read(self.users_file)
+        except FileNotFoundError:
+            return {}
+
+    def save_users(self, users):
+        with self._write_lock(self.users_file):
+            self._write(self.users_file, users)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reps (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    goal NUMERIC NOT NULL DEFAULT 50000,
+    version INTEGER NOT NULL DEFAULT 0,
+    team TEXT
+);
+CREATE INDEX IF NOT EXISTS reps_team ON reps(team);
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    access TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sales (
+    name TEXT NOT NULL REFERENCES reps(name),
+    day TEXT NOT NULL,
+    amount NUMERIC NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (name, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS reps_position ON reps(position);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO versions (key, value) VALUES ('sales', 0), ('incentive', 0);
+CREATE TABLE IF NOT EXISTS sale_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    amount NUMERIC NOT NULL,
+    total NUMERIC NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS sales_insert_bumps_rep AFTER INSERT ON sales BEGIN
+    UPDATE reps SET version = version + 1 WHERE name = NEW.name;
+END;
+CREATE TRIGGER IF NOT EXISTS sales_update_bumps_rep AFTER UPDATE OF amount ON sales BEGIN
+    UPDATE reps SET version = version + 1 WHERE name = NEW.name;
+END;
+"""
+
+
+class SqliteBackend:
+    # One row per rep/day cell in a WAL-mode database. Readers never wait for a
+    # writer, every write is a single transaction of cell upserts, and the
+    # versions table gives every worker the same cheap change counter.
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        # Databases created before row versions existed get the column added
+        rep_columns = [row[1] for row in conn.execute('PRAGMA table_info(reps)')]
+        if rep_columns and 'version' not in rep_columns:
+            conn.execute('ALTER TABLE reps ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        if rep_columns and 'team' not in rep_columns:
+            conn.execute('ALTER TABLE reps ADD COLUMN team TEXT')
+        conn.executescript(SQLITE_SCHEMA)
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _version(self, key):
+        row = self._connection().execute('SELECT value FROM versions WHERE key = ?', (key,)).fetchone()
+        return f"sqlite-{row[0]}" if row else None
+
+    def _bump(self, conn, key):
+        conn.execute('UPDATE versions SET value = value + 1 WHERE key = ?', (key,))
+
+    def sales_version(self):
+        return self._version('sales')
+
+    def incentive_version(self):
+        return self._version('incentive')
+
+    def sale_events_version(self):
+        # Events are written in the same transaction as the sales they describe
+        return self._version('sales')
+
+    def _totals(self, conn, names=None):
+        query = 'SELECT r.name, COALESCE(SUM(s.amount), 0) FROM reps r LEFT JOIN sales s ON s.name = r.name'
+        if names is None:
+            return dict(conn.execute(query + ' GROUP BY r.name').fetchall())
+        names = list(names)
+        placeholders = ', '.join('?' * len(names))
+        return dict(conn.execute(query + f' WHERE r.name IN ({placeholders}) GROUP BY r.name', names).fetchall())
+
+    def _record_sales(self, conn, before):
+        increases = sale_increases(before, self._totals(conn, before))
+        if not increases:
+            return
+        now = time.time()
+        conn.executemany(
+            'INSERT INTO sale_events (name, amount, total, time) VALUES (?, ?, ?, ?)',
+            [(name, amount, total, now) for name, amount, total in increases],
+        )
+        conn.execute(
+            'DELETE FROM sale_events WHERE seq <= (SELECT MAX(seq) FROM sale_events) - ?',
+            (SALE_EVENT_LIMIT,),
+        )
+
+    def load_sale_events(self):
+        rows = self._connection().execute(
+            'SELECT seq, name, amount, total, time FROM sale_events ORDER BY seq'
+        ).fetchall()
+        return [dict(zip(('seq', 'name', 'amount', 'total', 'time'), row)) for row in rows]
+
+    def load_sales(self):
+        rows = self._connection().execute(
+            'SELECT r.name, r.team, r.goal, r.version, s.day, s.amount FROM reps r '
+            'LEFT JOIN sales s ON s.name = r.name ORDER BY r.position'
+        ).fetchall()
+        records = {}
+        for name, team, goal, version, day, amount in rows:
+            record = records.get(name)
+            if record is None:
+                record = records[name] = _rep_record(name, team, goal, version)
+            if day is not None:
+                record[day] = amount
+        return list(records.values())
+
+    def _load_row(self, conn, name):
+        rep = conn.execute('SELECT team, goal, version FROM reps WHERE name = ?', (name,)).fetchone()
+        if rep is None:
+            return None
+        row = _rep_record(name, *rep)
+        row.update(conn.execute('SELECT day, amount FROM sales WHERE name = ?', (name,)).fetchall())
+        return row
+
+    def _upsert_cells(self, conn, changes):
+        conn.executemany(
+            'INSERT INTO sales (name, day, amount) VALUES (?, ?, ?) '
+            'ON CONFLICT (name, day) DO UPDATE SET amount = excluded.amount, version = sales.version + 1 '
+            'WHERE sales.amount IS NOT excluded.amount',
+            [(name, day, to_number(value)) for name, day, value in changes],
+        )
+
+    def _add_reps(self, conn, rows):
+        # New reps go to the end of the board
+        position = conn.execute('SELECT COALESCE(MAX(position), -1) FROM reps').fetchone()[0]
+        conn.executemany(
+            'INSERT INTO reps (name, position, goal, team) VALUES (?, ?, ?, ?)',
+            [(row['Name'], position + i, to_number(row.get('Goal', DEFAULT_GOAL)), row.get('Team') or None)
+             for i, row in enumerate(rows, 1)],
+        )
+
+    def save_sales(self, rows):
+        # Same contract as JsonBackend.save_sales: the board becomes exactly
+        # `rows`, so reps (and day cells) that aren't in them are removed, and
+        # goals, teams and order come from the rows. Only what differs from
+        # what is stored gets written.
+        rows = normalize_rows(rows)
+        names = json.dumps([row['Name'] for row in rows])
+        with self._transaction() as conn:
+            changes_before = conn.total_changes
+            before = self._totals(conn)
+            conn.execute('DELETE FROM sales WHERE name NOT IN (SELECT value FROM json_each(?))', (names,))
+            conn.execute('DELETE FROM reps WHERE name NOT IN (SELECT value FROM json_each(?))', (names,))
+            conn.executemany(
+                'DELETE FROM sales WHERE name = ? AND day NOT IN (SELECT value FROM json_each(?))',
+                [(row['Name'], json.dumps(record_days(row))) for row in rows],
+            )
+            conn.executemany(
+                'INSERT INTO reps (name, position, goal, team) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET position = excluded.position, goal = excluded.goal, team = excluded.team, '
+                'version = reps.version + (reps.goal IS NOT excluded.goal OR reps.team IS NOT excluded.team) '
+                'WHERE reps.position IS NOT excluded.position OR reps.goal IS NOT excluded.goal OR reps.team IS NOT excluded.team',
+                [(row['Name'], position, row['Goal'], row.get('Team')) for position, row in enumerate(rows)],
+            )
+            self._upsert_cells(conn, [
+                (row['Name'], day, row[day]) for row in rows for day in record_days(row)
+            ])
+            if conn.total_changes != changes_before:
+                self._record_sales(conn, before)
+                self._bump(conn, 'sales')
+
+    def apply_edits(self, edits):
+        # Same contract as JsonBackend.apply_edits: one transaction, and each
+        # rep's cells are only written if its row version still matches
+        results = {}
+        with self._transaction() as conn:
+            changes_before = conn.total_changes
+            before = self._totals(conn, {name for name, _, _ in edits})
+            for name, cells, expected_version in edits:
+                row = self._load_row(conn, name)
+                if row is None:
+                    continue
+                if expected_version is not None and row['Version'] != expected_version:
+                    results[name] = (False, row)
+                    continue
+                cells = dict(cells)
+                if 'Goal' in cells:
+                    # Goals live on the rep, not in the day cells
+                    conn.execute(
+                        'UPDATE reps SET goal = ?, version = version + 1 WHERE name = ? AND goal IS NOT ?',
+                        (to_number(cells['Goal']), name, to_number(cells.pop('Goal'))),
+                    )
+                self._upsert_cells(conn, [(name, day, value) for day, value in cells.items()])
+                results[name] = (True, self._load_row(conn, name))
+            if conn.total_changes != changes_before:
+                self._record_sales(conn, before)
+                self._bump(conn, 'sales')
+        return results
+
+    def bulk_update(self, updates, days):
+        # Same contract as JsonBackend.bulk_update, in one transaction
+        with self._transaction() as conn:
+            changes_before = conn.total_changes
+            known = {row[0] for row in conn.execute('SELECT name FROM reps')}
+            new_reps = [name for name in updates if name not in known]
+            self._add_reps(conn, [dict(updates[name], Name=name) for name in new_reps])
+            self._upsert_cells(conn, [(name, day, 0) for name in new_reps for day in days])
+            changed = set()
+            for name, fields in updates.items():
+                fields = dict(fields)
+                team = fields.pop('Team', None)
+                goal = fields.pop('Goal', None)
+                before = conn.total_changes
+                if team is not None:
+                    conn.execute('UPDATE reps SET team = ?, version = version + 1 WHERE name = ? AND team IS NOT ?', (team, name, team))
+                if goal is not None:
+                    conn.execute('UPDATE reps SET goal = ?, version = version + 1 WHERE name = ? AND goal IS NOT ?', (to_number(goal), name, to_number(goal)))
+                self._upsert_cells(conn, [(name, day, value) for day, value in fields.items()])
+                if conn.total_changes != before:
+                    changed.add(name)
+            if conn.total_changes != changes_before:
+                self._bump(conn, 'sales')
+        return len(changed - set(new_reps)) + len(new_reps), len(new_reps)
+
+    def load_incentive(self):
+        row = self._connection().execute("SELECT value FROM settings WHERE key = 'incentive_text'").fetchone()
+        return row[0] if row else ''
+
+    def save_incentive(self, text):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO settings (key, value) VALUES ('incentive_text', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (text,),
+            )
+            self._bump(conn, 'incentive')
+
+    def load_users(self):
+        return dict(self._connection().execute('SELECT email, access FROM users').fetchall())
+
+    def save_users(self, users):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM users')
+            conn.executemany('INSERT INTO users (email, access) VALUES (?, ?)', list(users.items()))
+
+
+def _rep_record(name, team, goal, version):
+    record = {'Name': name}
+    if team:
+        record['Team'] = team
+    record.update({'Goal': goal, 'Version': version})
+    return record
+
+
+def import_json(backend, sales_file=SALES_FILE, incentive_file=INCENTIVE_FILE, users_file=USERS_FILE):
+    # One-shot copy of the JSON files into another backend
+    source = JsonBackend(sales_file, incentive_file, users_file=users_file)
+    rows = source.load_sales()
+    backend.save_sales(rows)
+    backend.save_incentive(source.load_incentive())
+    backend.save_users(source.load_users())
+    return len(rows)
+
+
+_backend = None
+
+
+def get_backend():
+    # ECS_STORAGE=sqlite switches to the database; JSON stays the default for small installs
+    global _backend
+    if _backend is None:
+        if os.environ.get('ECS_STORAGE', 'json').lower() == 'sqlite':
+            _backend = SqliteBackend(os.environ.get('ECS_SQLITE_PATH', SQLITE_FILE))
+        else:
+            _backend = JsonBackend()
+    return _backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sales data storage tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import-json', help='Copy the JSON files into a SQLite database')
+    import_parser.add_argument('--db', default=os.environ.get('ECS_SQLITE_PATH', SQLITE_FILE))
+    import_parser.add_argument('--sales', default=SALES_FILE)
+    import_parser.add_argument('--incentive', default=INCENTIVE_FILE)
+    import_parser.add_argument('--users', default=USERS_FILE)
+    normalize_parser = subparsers.add_parser(
+        'normalize', help='Rewrite a sales JSON file with typed values (SQLite already stores numbers)')
+    normalize_parser.add_argument('--sales', default=SALES_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'import-json':
+        count = import_json(SqliteBackend(args.db), args.sales, args.incentive, args.users)
+        print(f"Imported {count} reps into {args.db}")
+
+    if args.command == 'normalize':
+        changed = JsonBackend(sales_file=args.sales).normalize()
+        print(f"Normalized {changed} reps in {args.sales}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from storage import to_number
+
+
+INDEX_LIMIT = 16  # Versions kept, same as the table snapshots in app.py
+
+# One clause of a DataTable filter_query, e.g. {Monday} >= 1000 or {Name} icontains "rob"
+_CLAUSE = re.compile(r'^\s*\{(?P<column>[^}]+)\}\s*(?P<op>[a-z]+|[<>!=]=?)\s*(?P<value>.*?)\s*$', re.IGNORECASE)
+_OPERATORS = {
+    '=': 'eq', 'eq': 'eq', '!=': 'ne', 'ne': 'ne',
+    '<': 'lt', 'lt': 'lt', '<=': 'le', 'le': 'le',
+    '>': 'gt', 'gt': 'gt', '>=': 'ge', 'ge': 'ge',
+    'contains': 'contains', 'datestartswith': 'startswith',
+}
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        return value[1:-1]
+    return value
+
+
+def parse_filter(filter_query):
+    # 'clause && clause' -> [(column, op, value, case_sensitive)]. Clauses this
+    # doesn't understand are dropped rather than failing the whole query.
+    clauses = []
+    for part in (filter_query or '').split(' && '):
+        match = _CLAUSE.match(part)
+        if not match:
+            continue
+        op = match.group('op').lower()
+        case_sensitive = False
+        if op[0] in 'is' and op[1:] in _OPERATORS:
+            case_sensitive = op[0] == 's'
+            op = op[1:]
+        if op not in _OPERATORS:
+            continue
+        clauses.append((match.group('column'), _OPERATORS[op], _unquote(match.group('value')), case_sensitive))
+    return clauses
+
+
+class TableIndex:
+    # Column arrays and sort orders for one version of the table, so a page of
+    # a filtered, sorted roster is a few NumPy operations and a slice. Columns
+    # and orders are built the first time a query needs them.
+
+    def __init__(self, records, numeric_columns):
+        self.records = records
+        self.numeric_columns = set(numeric_columns)
+        self._lock = threading.Lock()
+        self._columns = {}
+        self._orders = {}
+
+    def column(self, name):
+        with self._lock:
+            values = self._columns.get(name)
+            if values is None:
+                if name in self.numeric_columns:
+                    values = np.array([to_number(record.get(name)) for record in self.records], dtype=float)
+                else:
+                    values = np.array(['' if record.get(name) is None else str(record.get(name)) for record in self.records], dtype=object)
+                self._columns[name] = values
+            return values
+
+    def order(self, name, descending=False):
+        key = (name, descending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            values = self.column(name)
+            if name not in self.numeric_columns:
+                # Case-insensitive text becomes its rank among the distinct values
+                values = np.unique(np.array([value.lower() for value in values], dtype=str), return_inverse=True)[1].reshape(-1)
+            # Stable both ways, so ties keep the stored order
+            order = np.argsort(-values if descending else values, kind='stable')
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def mask(self, filter_query):
+        mask = np.ones(len(self.records), dtype=bool)
+        for column, op, value, case_sensitive in parse_filter(filter_query):
+            if column in self.numeric_columns and op not in ('contains', 'startswith'):
+                try:
+                    number = float(value)
+                except ValueError:
+                    continue
+                values = self.column(column)
+                mask &= {
+                    'eq': values == number, 'ne': values != number,
+                    'lt': values < number, 'le': values <= number,
+                    'gt': values > number, 'ge': values >= number,
+                }[op]
+                continue
+            values = self.column(column)
+            if column in self.numeric_columns:
+                values = np.array([f"{number:g}" for number in values], dtype=object)
+            if not case_sensitive:
+                value = value.lower()
+                values = np.array([text.lower() for text in values], dtype=object)
+            test = {
+                'eq': lambda text: text == value, 'ne': lambda text: text != value,
+                'lt': lambda text: text < value, 'le': lambda text: text <= value,
+                'gt': lambda text: text > value, 'ge': lambda text: text >= value,
+                'contains': lambda text: value in text, 'startswith': lambda text: text.startswith(value),
+            }[op]
+            mask &= np.fromiter((test(text) for text in values), dtype=bool, count=len(values))
+        return mask
+
+    def query(self, filter_query='', sort_by=None, page_current=0, page_size=25):
+        # (records on the page, page count, matching rows)
+        rows = np.arange(len(self.records))
+        if sort_by:
+            sort = sort_by[0]
+            rows = self.order(sort['column_id'], sort.get('direction') == 'desc')
+        if filter_query:
+            rows = rows[self.mask(filter_query)[rows]]
+        page_count = max(1, math.ceil(len(rows) / page_size))
+        page_current = min(max(page_current or 0, 0), page_count - 1)
+        page = rows[page_current * page_size:(page_current + 1) * page_size]
+        return [self.records[i] for i in page.tolist()], page_count, len(rows)
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def table_index(version, records, numeric_columns):
+    # One index per data version, shared by every query against it
+    with _indexes_lock:
+        index = _indexes.get(version)
+        if index is None or index.records is not records:
+            index = _indexes[version] = TableIndex(records, numeric_columns)
+            while len(_indexes) > INDEX_LIMIT:
+                _indexes.popitem(last=False)
+        return index
@@ -0,0 +1,27 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The app is a set of flat modules in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    # The Dash app, imported against a throwaway board so tests never touch the real files
+    workspace = tmp_path_factory.mktemp('app')
+    (workspace / 'sales_data.json').write_text(json.dumps([
+        {'Name': name, 'Monday': 100 * i, 'Tuesday': 0, 'Wednesday': 0, 'Thursday': 0, 'Friday': 0, 'Goal': 50000, 'Version': 0}
+        for i, name in enumerate(['Ann', 'Bob', 'Cid'])
+    ]))
+    (workspace / 'incentive_data.json').write_text(json.dumps({'incentive_text': 'Test incentive'}))
+    with pytest.MonkeyPatch.context() as patch:
+        # Storage paths are relative and the backend is picked on first use
+        patch.chdir(workspace)
+        patch.setenv('ECS_STORAGE', 'json')
+        patch.setenv('ECS_SALES_SNAPSHOT', str(workspace / '.sales_snapshot'))
+        patch.setenv('ECS_INCENTIVE_SNAPSHOT', str(workspace / '.incentive_snapshot'))
+        import app
+        yield app
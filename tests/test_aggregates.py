@@ -0,0 +1,68 @@
+import datetime
+import random
+
+from aggregates import SalesAggregates
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+WEDNESDAY = datetime.date(2026, 10, 14)
+
+
+def rep(name, amounts, goal=1000, team=None):
+    row = {'Name': name, **dict(zip(DAYS, amounts)), 'Goal': goal}
+    if team:
+        row['Team'] = team
+    return row
+
+
+def fresh(rows):
+    aggregates = SalesAggregates(DAYS)
+    aggregates.sync('v', rows)
+    return aggregates
+
+
+def snapshot(aggregates):
+    return (aggregates.leaderboard(WEDNESDAY), aggregates.team(WEDNESDAY), aggregates.team_rollups(WEDNESDAY))
+
+
+def test_leaderboard_ranks_and_pace():
+    aggregates = fresh([rep('Ann', [100, 200]), rep('Bob', [600], goal=0), rep('Cid', [])])
+    board = aggregates.leaderboard(WEDNESDAY)
+    assert [(entry['rank'], entry['name'], entry['total']) for entry in board] == [(1, 'Bob', 600), (2, 'Ann', 300), (3, 'Cid', 0)]
+    ann = aggregates.rep('Ann', WEDNESDAY)
+    assert ann['percent'] == 30.0 and ann['pace'] == 100.0 and ann['projected'] == 500.0
+    assert ann['needed_per_day'] == 350.0
+    assert aggregates.rep('Bob', WEDNESDAY)['percent'] == 0.0
+    assert aggregates.team(WEDNESDAY)['total'] == 900
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = random.Random(7)
+    names = [f"Rep {i}" for i in range(20)]
+    rows = {name: rep(name, [rng.randint(0, 500) for _ in DAYS], team=rng.choice(['', 'East', 'West'])) for name in names}
+    aggregates = fresh(list(rows.values()))
+    for step in range(200):
+        name = rng.choice(names)
+        action = rng.random()
+        if action < 0.1 and name in rows:
+            del rows[name]
+        else:
+            # New sales, corrections downwards, goal and team changes
+            rows[name] = rep(name, [rng.randint(0, 500) for _ in DAYS], goal=rng.choice([1000, 2000]), team=rng.choice(['', 'East', 'West']))
+        if step % 3 == 0 and name in rows:
+            # The saving worker applies its row first, then syncs like everyone else
+            aggregates.apply_row(rows[name])
+        aggregates.sync(step, list(rows.values()))
+        assert snapshot(aggregates) == snapshot(fresh(list(rows.values())))
+
+
+def test_sync_at_the_same_version_is_a_no_op():
+    aggregates = fresh([rep('Ann', [100])])
+    aggregates.sync('v', [rep('Ann', [900])])
+    assert aggregates.team_total == 100
+
+
+def test_team_rollups_leave_out_reps_without_a_team():
+    aggregates = fresh([rep('Ann', [100], team='East'), rep('Bob', [300], team='West'), rep('Cid', [50], team='East'), rep('Dee', [999])])
+    rollups = aggregates.team_rollups(WEDNESDAY)
+    assert [(rollup['team'], rollup['total'], rollup['goal'], rollup['reps']) for rollup in rollups] == [
+        ('West', 300, 1000, 1), ('East', 150, 2000, 2)]
@@ -0,0 +1,124 @@
+"""Server callback requests per tick, counted against the running app.
+
+A small stand-in for the Dash renderer drives the app through the Flask
+test client. It reads the callback graph from /_dash-dependencies (what a
+browser gets), keeps every component prop from the layouts it was sent,
+and on each tick or store change POSTs every server callback that has a
+changed input. Only outputs a response actually updates count as changed,
+so a no_update stops the chain the way it does in the browser. Clientside
+callbacks are not run. "before" also counts the presentation callbacks
+that now run in assets/resize_textarea.js, as if they still needed a
+request.
+"""
+import pytest
+
+# Outputs of the callbacks that were moved clientside
+MOVED_OUTPUTS = {'cycling-image.src', 'notification-audio.src', 'sales-table.editable'}
+
+
+def _parts(output):
+    return [part.split('@')[0] for part in output.strip('.').split('...')]
+
+
+class Renderer:
+    def __init__(self, app):
+        self.app = app
+        self.client = app.server.test_client()
+        self.callbacks = self.client.get('/_dash-dependencies').get_json()
+        self.props = {}
+        self._collect(self.client.get('/_dash-layout').get_json())
+
+    def _collect(self, tree):
+        # Every prop of every component with an id, as the renderer holds them
+        if isinstance(tree, list):
+            for item in tree:
+                self._collect(item)
+        elif isinstance(tree, dict) and 'props' in tree:
+            props = tree['props']
+            for key, value in props.items():
+                if 'id' in props:
+                    self.props[f"{props['id']}.{key}"] = value
+                self._collect(value)
+
+    def _post(self, callback, changed):
+        outputs = [{'id': part.rsplit('.', 1)[0], 'property': part.rsplit('.', 1)[1]} for part in _parts(callback['output'])]
+        body = {
+            'output': callback['output'],
+            'outputs': outputs if callback['output'].startswith('..') else outputs[0],
+            'inputs': [dict(item, value=self.props.get(f"{item['id']}.{item['property']}")) for item in callback['inputs']],
+            'state': [dict(item, value=self.props.get(f"{item['id']}.{item['property']}")) for item in callback['state']],
+            'changedPropIds': sorted(changed),
+        }
+        response = self.client.post('/_dash-update-component', json=body)
+        assert response.status_code in (200, 204), response.get_data(as_text=True)
+        updated = set()
+        if response.status_code == 200:
+            for component, values in response.get_json()['response'].items():
+                for prop, value in values.items():
+                    key = f"{component}.{prop}"
+                    if not (isinstance(value, dict) and '__dash_patch_update' in value):
+                        self.props[key] = value
+                        self._collect(value)
+                    updated.add(key)
+        return updated
+
+    def change(self, **props):
+        # Set props as the browser would (a tick, a store write) and run what
+        # they trigger. Returns (before, after) request counts and the server
+        # callbacks that ran, by first output.
+        changed = set()
+        for key, value in props.items():
+            key = key.replace('__', '.')
+            self.props[key] = value
+            changed.add(key)
+        fired = set()
+        server, moved = [], 0
+        pending = True
+        while pending:
+            pending = False
+            for index, callback in enumerate(self.callbacks):
+                inputs = {f"{item['id']}.{item['property']}" for item in callback['inputs']}
+                if index in fired or not inputs & changed:
+                    continue
+                fired.add(index)
+                pending = True
+                if callback.get('clientside_function'):
+                    moved += bool(MOVED_OUTPUTS.intersection(_parts(callback['output'])))
+                    continue
+                server.append(_parts(callback['output'])[0])
+                changed |= self._post(callback, inputs & changed)
+        return len(server) + moved, len(server), server
+
+
+@pytest.fixture
+def board(app):
+    renderer = Renderer(app)
+    renderer.change(**{'user-access-level__data': {'access': 'full'}, 'url__pathname': '/page_1'})
+    # The first poll only takes the newest sale as the starting point
+    renderer.change(**{'interval-component__n_intervals': 1})
+    return renderer
+
+
+def test_image_tick_needs_no_server_request(board):
+    before, after, _ = board.change(**{'image-interval__n_intervals': 1})
+    assert (before, after) == (1, 0)
+
+
+def test_data_tick_only_polls_when_nothing_changed(board):
+    before, after, server = board.change(**{'interval-component__n_intervals': 2})
+    assert (before, after) == (3, 3)
+    assert sorted(server) == ['incentive-text.value', 'notification.style', 'sales-table.data']
+
+
+def test_data_tick_after_a_sale(board, app):
+    app.save_table_edits([('Bob', {'Tuesday': 500}, None)])  # Saved from another screen
+    before, after, server = board.change(**{'interval-component__n_intervals': 2})
+    # The sale sets off the notification sound, which no longer needs a request
+    assert (before, after) == (6, 5)
+    assert {'sales-graph.figure', 'goal-graph.figure'} <= set(server)
+
+
+def test_access_change_only_rebuilds_the_page(board):
+    before, after, server = board.change(**{'user-access-level__data': {'access': 'limited'}})
+    assert (before, after) == (2, 1)
+    assert server == ['page-content.children']
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+from history import SalesHistory
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+# ISO weeks 41 to 43 of 2026
+W41_MONDAY = datetime.date(2026, 10, 5)
+W41_FRIDAY = datetime.date(2026, 10, 9)
+W42_MONDAY = datetime.date(2026, 10, 12)
+W42_FRIDAY = datetime.date(2026, 10, 16)
+W43_MONDAY = datetime.date(2026, 10, 19)
+
+
+def board(**mondays):
+    return [{'Name': name, **{day: 0 for day in DAYS}, 'Monday': amount} for name, amount in mondays.items()]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return SalesHistory(str(tmp_path / 'history'))
+
+
+def test_correction_downwards_reaches_the_archive(archive):
+    archive.record_board(board(Ann=50000), DAYS, W42_MONDAY)
+    archive.record_board(board(Ann=5000), DAYS, W42_MONDAY)
+    assert archive.weekly_totals('Ann') == {'2026-W42': 5000.0}
+
+
+def test_repeated_amount_after_reset_counts(archive):
+    archive.record_board(board(Ann=1000), DAYS, W41_MONDAY)
+    archive.record_board(board(Ann=0), DAYS, W41_FRIDAY)
+    archive.record_board(board(Ann=1000), DAYS, W42_MONDAY)
+    assert archive.weekly_totals('Ann') == {'2026-W41': 1000.0, '2026-W42': 1000.0}
+
+
+def test_repeated_amount_after_monday_reset_counts(archive):
+    archive.record_board(board(Ann=1000), DAYS, W41_MONDAY)
+    archive.record_board(board(Ann=0), DAYS, W42_MONDAY)
+    archive.record_board(board(Ann=1000), DAYS, W42_MONDAY)
+    assert archive.weekly_totals('Ann') == {'2026-W41': 1000.0, '2026-W42': 1000.0}
+
+
+def test_reset_closes_the_week_it_held(archive):
+    archive.record_board(board(Ann=0), DAYS, W42_MONDAY)
+    archive.record_board(board(Ann=700), DAYS, W42_MONDAY)
+    assert archive.record_board(board(Ann=0), DAYS, W42_FRIDAY) == '2026-W43'
+    # Sales after the reset belong to the next week, even before it starts
+    archive.record_board(board(Ann=300), DAYS, W42_FRIDAY)
+    archive.record_board(board(Ann=500), DAYS, W43_MONDAY)
+    assert archive.weekly_totals('Ann') == {'2026-W42': 700.0, '2026-W43': 500.0}
+
+
+def test_first_save_of_a_new_week_leaves_the_old_week_alone(archive):
+    archive.record_board(board(Ann=400, Bob=100), DAYS, W41_FRIDAY)
+    archive.record_board(board(Ann=400, Bob=250), DAYS, W42_MONDAY)
+    assert archive.rep_week_totals('2026-W41') == {'Ann': 400.0, 'Bob': 100.0}
+    assert archive.rep_week_totals('2026-W42') == {'Ann': 400.0, 'Bob': 250.0}
+
+
+def test_reset_of_a_board_carried_into_the_week_starts_it_over(archive):
+    archive.record_board(board(Ann=400), DAYS, W41_FRIDAY)
+    archive.record_board(board(Ann=450), DAYS, W42_MONDAY)  # Not zeroed yet
+    archive.record_board(board(Ann=0), DAYS, W42_MONDAY)
+    archive.record_board(board(Ann=80), DAYS, W42_MONDAY)
+    assert archive.weekly_totals('Ann') == {'2026-W41': 400.0, '2026-W42': 80.0}
+
+
+def test_record_week_replaces_a_week(archive):
+    archive.record_board(board(Ann=400), DAYS, W42_MONDAY)
+    archive.record_week(board(Ann=90), DAYS, '2026-W41')
+    assert archive.weekly_totals('Ann') == {'2026-W41': 90.0, '2026-W42': 400.0}
@@ -0,0 +1,18 @@
+import datetime
+
+
+def test_board_layout_is_cached_per_data_version_and_day(app):
+    version, incentive = app.sales_data_version(), app.incentive_text_version()
+    today = datetime.date(2026, 10, 14)
+    layout = app.cached_layout('/page_1', 'full', version, incentive, today)
+    assert app.cached_layout('/page_1', 'full', version, incentive, today) is layout
+    # Pace in the goal graph moves with the day, so a new day builds the page again
+    assert app.cached_layout('/page_1', 'full', version, incentive, today + datetime.timedelta(days=1)) is not layout
+    assert app.cached_layout('/page_1', 'limited', version, incentive, today) is not layout
+
+
+def test_cached_layout_is_plain_dicts(app):
+    layout = app.display_page('/page_1', {'access': 'full'})
+    assert isinstance(layout, dict) and layout['type'] == 'Div'
+    assert app.display_page('/page_1', {'access': 'full'}) is layout
+    assert app.display_page('/page_1', {'access': 'nobody'}) == app.display_page('/', None)
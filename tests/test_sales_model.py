@@ -0,0 +1,31 @@
+from sales_model import SalesBoard
+from storage import DEFAULT_GOAL, normalize_row
+
+DAYS = ["Monday", "Tuesday"]
+
+
+def test_records_match_normalized_rows():
+    rows = [{'Name': 'Ann', 'Team': 'East', 'Monday': 100, 'Tuesday': 2.5, 'Goal': 1000, 'Version': 3}]
+    record = SalesBoard(rows, DAYS).records()[0]
+    assert record['Monday'] == 100 and record['Tuesday'] == 2.5 and record['Total'] == 102.5
+    assert (record['Team'], record['Goal'], record['Version']) == ('East', 1000, 3)
+
+
+def test_unmigrated_cells_and_goals_are_coerced():
+    # Rows as files had them before saves were normalized
+    rows = [
+        {'Name': 'Ann', 'Monday': '100', 'Tuesday': '', 'Goal': '2500'},
+        {'Name': 'Bob', 'Monday': None, 'Tuesday': 'abc', 'Goal': ''},
+        {'Name': 'Cid', 'Monday': 5, 'Tuesday': 5, 'Goal': '1,000'},
+        {'Name': 'Dee', 'Monday': 0, 'Tuesday': 0, 'Goal': None},
+        {'Name': 'Eve', 'Monday': 0, 'Tuesday': 0},
+    ]
+    records = SalesBoard(rows, DAYS).records()
+    assert [record['Total'] for record in records] == [100, 0, 10, 0, 0]
+    assert [record['Goal'] for record in records] == [2500, 0, 0, 0, DEFAULT_GOAL]
+    # The same numbers storage writes when it normalizes the rows
+    assert [record['Goal'] for record in records] == [normalize_row(row)['Goal'] for row in rows]
+
+
+def test_empty_board():
+    assert SalesBoard([], DAYS).records() == []
@@ -0,0 +1,66 @@
+import pytest
+
+from shared_cache import SharedSnapshot
+
+
+class Backend:
+    # Stand-in for a storage backend: a version counter and the value behind it
+    def __init__(self):
+        self.version = 1
+        self.loads = 0
+
+    def current_version(self):
+        return self.version
+
+    def load(self):
+        self.loads += 1
+        return self.version, {'total': self.version * 100}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'snapshot')
+
+
+def test_other_workers_see_a_published_value(path):
+    backend = Backend()
+    saver, reader = SharedSnapshot(path), SharedSnapshot(path)
+    assert reader.read() is None
+    saver.refresh(backend.load, backend.current_version)
+    assert reader.read() == (1, {'total': 100})
+    assert reader.get(backend.current_version, backend.load) == (1, {'total': 100})
+    assert backend.loads == 1
+
+
+def test_an_outdated_value_is_not_published(path):
+    backend = Backend()
+    slow, fast = SharedSnapshot(path), SharedSnapshot(path)
+    stale = backend.load()  # Read before the other worker saved
+    backend.version = 2
+    fast.refresh(backend.load, backend.current_version)
+    assert not slow.publish(*stale, backend.current_version)
+    assert SharedSnapshot(path).read() == (2, {'total': 200})
+
+
+def test_get_reloads_when_the_backend_moved(path):
+    backend = Backend()
+    snapshot = SharedSnapshot(path, recheck_seconds=0)
+    snapshot.get(backend.current_version, backend.load)
+    backend.version = 2
+    assert snapshot.get(backend.current_version, backend.load) == (2, {'total': 200})
+
+
+def test_get_skips_the_recheck_window_for_an_expected_version(path):
+    backend = Backend()
+    snapshot = SharedSnapshot(path, recheck_seconds=3600)
+    snapshot.get(backend.current_version, backend.load)
+    backend.version = 2  # Saved outside the app
+    assert snapshot.get(backend.current_version, backend.load)[0] == 1
+    assert snapshot.get(backend.current_version, backend.load, expected=2)[0] == 2
+
+
+def test_values_larger_than_the_file_grow_it(path):
+    backend = Backend()
+    big = {'rows': ['x' * 100] * 2000}
+    SharedSnapshot(path).publish(1, big, backend.current_version)
+    assert SharedSnapshot(path).read() == (1, big)
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from storage import JsonBackend, SqliteBackend
+
+DAYS = ["Monday", "Tuesday"]
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SqliteBackend(str(tmp_path / 'sales.db'))
+    return JsonBackend(str(tmp_path / 'sales.json'), str(tmp_path / 'incentive.json'),
+                       str(tmp_path / 'events.json'), str(tmp_path / 'users.json'))
+
+
+def rep(name, monday=0, tuesday=0, goal=100000, **fields):
+    return {'Name': name, 'Monday': monday, 'Tuesday': tuesday, 'Goal': goal, **fields}
+
+
+def board(backend):
+    # What both backends should agree on; versions are only compared for "went up"
+    return [{key: value for key, value in row.items() if key != 'Version'} for row in backend.load_sales()]
+
+
+def test_save_sales_replaces_the_board(backend):
+    backend.save_sales([rep('Ann', 100), rep('Bob', 50), rep('Cid')])
+    backend.save_sales([rep('Bob', 50, goal=999), rep('Ann', 100, 20, Team='East')])
+    assert board(backend) == [rep('Bob', 50, goal=999), rep('Ann', 100, 20, Team='East')]
+
+
+def test_save_sales_bumps_changed_reps_only(backend):
+    backend.save_sales([rep('Ann', 100), rep('Bob', 50)])
+    versions = {row['Name']: row['Version'] for row in backend.load_sales()}
+    backend.save_sales([rep('Ann', 100, goal=999), rep('Bob', 50)])
+    after = {row['Name']: row['Version'] for row in backend.load_sales()}
+    assert after['Ann'] > versions['Ann']
+    assert after['Bob'] == versions['Bob']
+
+
+def test_save_sales_changes_the_version(backend):
+    backend.save_sales([rep('Ann', 100)])
+    version = backend.sales_version()
+    backend.save_sales([rep('Ann', 100, goal=999)])
+    assert backend.sales_version() != version
+
+
+def test_apply_edits_checks_row_versions(backend):
+    backend.save_sales([rep('Ann', 100), rep('Bob', 50)])
+    versions = {row['Name']: row['Version'] for row in backend.load_sales()}
+    results = backend.apply_edits([
+        ('Ann', {'Monday': 150, 'Goal': 2000}, versions['Ann']),
+        ('Bob', {'Monday': 999}, versions['Bob'] - 1),
+        ('Nobody', {'Monday': 1}, None),
+    ])
+    assert set(results) == {'Ann', 'Bob'}
+    assert results['Ann'][0] and not results['Bob'][0]
+    assert board(backend) == [rep('Ann', 150, goal=2000), rep('Bob', 50)]
+
+
+def test_sale_events_record_increases(backend):
+    backend.save_sales([rep('Ann', 100), rep('Bob', 50)])
+    version = backend.sales_version()
+    backend.apply_edits([('Ann', {'Tuesday': 40}, None), ('Bob', {'Monday': 10}, None)])
+    events = backend.load_sale_events()
+    assert [(event['name'], event['amount'], event['total']) for event in events] == [('Ann', 40, 140)]
+    assert backend.sales_version() != version
+
+
+def test_bulk_update_adds_and_changes_reps(backend):
+    backend.save_sales([rep('Ann', 100)])
+    assert backend.bulk_update({'Ann': {'Monday': 100, 'Team': 'West'}, 'Dee': {'Tuesday': 7}}, DAYS) == (2, 1)
+    assert board(backend) == [rep('Ann', 100, Team='West'), rep('Dee', 0, 7, goal=50000)]
+
+
+def test_json_saves_keep_the_file_mode(tmp_path):
+    backend = JsonBackend(str(tmp_path / 'sales.json'), events_file=str(tmp_path / 'events.json'))
+    backend.save_sales([rep('Ann', 100)])
+    assert os.stat(backend.sales_file).st_mode & 0o777 == 0o644
+    os.chmod(backend.sales_file, 0o640)
+    backend.apply_edits([('Ann', {'Monday': 150}, None)])
+    assert os.stat(backend.sales_file).st_mode & 0o777 == 0o640
+
+
+def test_json_writes_sale_events_before_the_sales(tmp_path, monkeypatch):
+    # Another worker's watcher pushes as soon as the sales file changes
+    backend = JsonBackend(str(tmp_path / 'sales.json'), events_file=str(tmp_path / 'events.json'))
+    backend.save_sales([rep('Ann', 100)])
+    written = []
+    write = backend._write
+    monkeypatch.setattr(backend, '_write', lambda path, data: (written.append(path), write(path, data)))
+    backend.apply_edits([('Ann', {'Monday': 150}, None)])
+    backend.save_sales([rep('Ann', 200)])
+    assert written == [backend.events_file, backend.sales_file] * 2
@@ -0,0 +1,48 @@
+from table_query import TableIndex, parse_filter, table_index
+
+NUMERIC = ['Monday', 'Total']
+RECORDS = [
+    {'Name': 'rob', 'Monday': 100, 'Total': 100},
+    {'Name': 'Ann', 'Monday': 300, 'Total': 450},
+    {'Name': 'bob', 'Monday': 100, 'Total': 2500},
+    {'Name': 'Cid', 'Monday': '', 'Total': 0},
+]
+
+
+def names(result):
+    return [record['Name'] for record in result[0]]
+
+
+def test_parse_filter():
+    assert parse_filter('{Monday} >= 100 && {Name} scontains "Ro" && {Total} bogus 1') == [
+        ('Monday', 'ge', '100', False), ('Name', 'contains', 'Ro', True)]
+
+
+def test_sort_is_stable_and_case_insensitive():
+    index = TableIndex(RECORDS, NUMERIC)
+    assert names(index.query(sort_by=[{'column_id': 'Monday', 'direction': 'asc'}])) == ['Cid', 'rob', 'bob', 'Ann']
+    assert names(index.query(sort_by=[{'column_id': 'Monday', 'direction': 'desc'}])) == ['Ann', 'rob', 'bob', 'Cid']
+    assert names(index.query(sort_by=[{'column_id': 'Name', 'direction': 'asc'}])) == ['Ann', 'bob', 'Cid', 'rob']
+
+
+def test_filters():
+    index = TableIndex(RECORDS, NUMERIC)
+    assert names(index.query('{Monday} = 100')) == ['rob', 'bob']
+    assert names(index.query('{Name} contains "OB"')) == ['rob', 'bob']
+    assert names(index.query('{Name} scontains "OB"')) == []
+    assert names(index.query('{Total} contains 25')) == ['bob']
+    assert names(index.query('{Monday} > 50 && {Total} < 1000')) == ['rob', 'Ann']
+    assert names(index.query('{Monday} > abc')) == names(index.query(''))
+
+
+def test_pages():
+    index = TableIndex(RECORDS, NUMERIC)
+    sort = [{'column_id': 'Total', 'direction': 'desc'}]
+    assert index.query('', sort, 0, 3)[1:] == (2, 4)
+    assert names(index.query('', sort, 1, 3)) == ['Cid']
+    assert names(index.query('', sort, 9, 3)) == ['Cid']  # Past the end: the last page
+
+
+def test_one_index_per_version():
+    assert table_index('v1', RECORDS, NUMERIC) is table_index('v1', RECORDS, NUMERIC)
+    assert table_index('v1', list(RECORDS), NUMERIC) is not table_index('v2', RECORDS, NUMERIC)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from storage import TIER_SUFFIX
+
+
+# Color tiers for sales amounts, shared by the table and the graph: (upper
+# bound, color) with each bound inclusive, and the last tier open-ended.
+# Edit this list to move a band or add one; both views follow.
+SALES_TIERS = [
+    (999, 'black'),
+    (1999, 'red'),
+    (2999, 'blue'),
+    (3999, 'orange'),
+    (4999, 'purple'),
+    (None, 'green'),
+]
+TIER_THRESHOLDS = np.array([bound for bound, _ in SALES_TIERS[:-1]], dtype=float)
+TIER_COLORS = np.array([color for _, color in SALES_TIERS])
+
+
+def tier_field(column):
+    return column + TIER_SUFFIX
+
+
+def tiers(values):
+    # Tier index of every value, any shape
+    return np.searchsorted(TIER_THRESHOLDS, np.asarray(values, dtype=float), side='left')
+
+
+def tier_colors(values):
+    return TIER_COLORS[tiers(values)]
+
+
+def add_tiers(records, columns):
+    # Store each numeric cell's tier next to it (e.g. Monday_tier) so the
+    # table styles with an equality check instead of range queries per cell
+    if not records:
+        return records
+    matrix = np.array([[record.get(column, 0) for column in columns] for record in records], dtype=float)
+    fields = [tier_field(column) for column in columns]
+    for record, row_tiers in zip(records, tiers(matrix).tolist()):
+        record.update(zip(fields, row_tiers))
+    return records
+
+
+def tier_style_rules(columns, default_color=None):
+    # One equality rule per column and tier; pass the table's own text color
+    # as default_color to leave that tier's rules out
+    return [
+        {'if': {'filter_query': f"{{{tier_field(column)}}} = {index}", 'column_id': column}, 'color': color}
+        for index, color in enumerate(TIER_COLORS.tolist()) if color != default_color
+        for column in columns
+    ]
@@ -1 +1,31 @@
-from app import server as application  # Import the Flask server
+# Entry points for gunicorn. Importing this module is cheap: the dashboard
+# (dash, plotly, numpy and our own modules) is only imported by create_app().
+#
+#   gunicorn --preload --worker-class gthread --threads 50 'wsgi:create_app()'   # or wsgi:application
+#
+# Use a threaded worker: every open dashboard keeps a /sales-events stream
+# (one thread, reconnected every few minutes). Under the default sync worker
+# the stream is switched off and screens fall back to polling.
+#
+# With --preload the master imports the app once and every worker is forked
+# with it already loaded (plotly's lazily built validators included), so a
+# worker (re)start costs a fork. No sales data is read at import time; each
+# worker loads it on first use from the shared snapshot, so what a new worker
+# shows is never older than its first request.
+# The watcher thread, memory maps and SQLite connections are opened per
+# process after the fork.
+
+
+def create_app(warm=True):
+    from app import server  # Import the Flask server
+    if warm:
+        from figures import warm_up
+        warm_up()
+    return server
+
+
+def __getattr__(name):
+    # Keeps wsgi:application working without importing the app on `import wsgi`
+    if name == 'application':
+        return create_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")